@@ -1,8 +1,30 @@
+import os
+
 from flask import Flask
+from server_timing import ServerTiming
+
 from .routes import bp
 
 def create_app():
     app = Flask(__name__)
     app.secret_key = "dev-secret-change-me"
+
+    # "docker" (default): each lab runs in its own container.
+    # "inprocess": every lab is imported into this process and served under /lab/<id>/.
+    app.config["LAB_RUNTIME"] = os.environ.get("WWC_LAB_RUNTIME", "docker")
+
+    ServerTiming(app, label="hub")
     app.register_blueprint(bp)
+
+    if app.config["LAB_RUNTIME"] == "inprocess":
+        from .inprocess import mount_labs
+
+        mount_labs(app)
+    else:
+        from .reaper import start_reaper
+        from .telemetry import start_telemetry
+
+        start_reaper()
+        start_telemetry()
+
     return app
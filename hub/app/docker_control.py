@@ -1,22 +1,56 @@
 from __future__ import annotations
 
 import json
+import os
+import threading
 import time
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Iterator, Optional
+from urllib.parse import urlsplit
 
 import docker
-from docker.errors import NotFound
+from docker.errors import DockerException, NotFound
+from requests.exceptions import RequestException
 
 
-LABS_JSON_PATH = Path("/app/labs/labs.json")
+# Baked into the hub image; WWC_LABS_JSON points at a checkout's labs/labs.json instead.
+LABS_JSON_PATH = Path(os.environ.get("WWC_LABS_JSON", "/app/labs/labs.json"))
+
+# Bridge network shared by the hub and lab containers. The hub reaches each lab
+# by container name on this network, so labs don't need published host ports.
+LAB_NETWORK = os.environ.get("WWC_LAB_NETWORK", "wwc2025-labs")
+
+# Pool of Docker daemons labs can be placed on, as comma-separated name=url
+# entries. "local" is the hub's own daemon (DOCKER_HOST / the mounted socket);
+# other entries are any Docker base URL, optionally followed by #address when
+# the lab's published ports are reachable at a different address than the
+# daemon URL, e.g.:
+#
+#   WWC_DOCKER_HOSTS="hub=local, spare1=tcp://10.0.0.12:2375, spare2=ssh://lab@10.0.0.13#10.0.0.13"
+#
+# Unset means just the local daemon, exactly as before.
+DOCKER_HOSTS = os.environ.get("WWC_DOCKER_HOSTS", "")
+
+# How long a host's ping/info result is trusted before checking again (seconds)
+HOST_CHECK_TTL = float(os.environ.get("WWC_HOST_CHECK_TTL", "10"))
+HOST_TIMEOUT = 5
+
+# How a lab switch treats the lab that is already running:
+#   overlap - keep it serving until the new lab is ready, then stop it in the background
+#   serial  - stop it first, then start the new lab
+SWITCH_MODE = os.environ.get("WWC_SWITCH_MODE", "overlap")
+
+# Request timing settings (shared/server_timing.py) the hub passes on to the
+# lab containers it starts, so they are set once on the hub service.
+LAB_ENV_PASSTHROUGH = ("WWC_SERVER_TIMING", "WWC_SLOW_MS", "WWC_SLOW_WINDOW", "WWC_PROFILING")
 
 
 @dataclass(frozen=True)
 class LabPort:
     container_port: int
-    host_port: int
+    # Optional: only published on the host when set (labs are normally reached via the hub at /lab/<id>/)
+    host_port: Optional[int] = None
 
 
 @dataclass(frozen=True)
@@ -28,10 +62,214 @@ class LabSpec:
     image: str
     ports: list[LabPort]
     launch_url: str
+    # Lab source directory, relative to labs.json (used by the in-process runtime)
+    path: str = ""
+
+
+@dataclass(frozen=True)
+class DockerHost:
+    name: str
+    # None: the hub's own daemon (docker.from_env())
+    base_url: Optional[str] = None
+    # Where the hub reaches ports published on this host (remote hosts only)
+    address: Optional[str] = None
+
+    @property
+    def is_local(self) -> bool:
+        return self.base_url is None
+
+
+@dataclass(frozen=True)
+class HostStatus:
+    host: DockerHost
+    healthy: bool
+    error: str = ""
+    running: int = 0
+    mem_total: int = 0
+    checked_at: float = 0.0
+
+    @property
+    def load(self) -> float:
+        """
+        Running containers (counting the one about to start) per GiB of daemon
+        memory; lower is less loaded, so idle hosts with more memory go first.
+        """
+        gib = max(self.mem_total / 2**30, 0.5)
+        return (self.running + 1) / gib
+
+
+@dataclass(frozen=True)
+class Placement:
+    host: DockerHost
+    # Base URL the hub's proxy forwards /lab/<id>/ to
+    upstream: str
+    # Published address on a remote host, for reaching the lab without the hub
+    direct_url: Optional[str] = None
+
+
+def _parse_hosts(spec: str) -> list[DockerHost]:
+    hosts: list[DockerHost] = []
+    for i, entry in enumerate(e.strip() for e in spec.split(",")):
+        if not entry:
+            continue
+        name, sep, url = entry.partition("=")
+        if not sep:
+            name, url = f"host{i + 1}", entry
+        name, url = name.strip(), url.strip()
+
+        if url in ("", "local"):
+            hosts.append(DockerHost(name=name))
+            continue
+
+        url, _, address = url.partition("#")
+        if not address:
+            parts = urlsplit(url)
+            address = parts.hostname if parts.scheme in ("tcp", "http", "https", "ssh") else "127.0.0.1"
+        hosts.append(DockerHost(name=name, base_url=url, address=address))
+
+    return hosts or [DockerHost(name="local")]
+
+
+HOSTS: list[DockerHost] = _parse_hosts(DOCKER_HOSTS)
+
+_clients: dict[str, docker.DockerClient] = {}
+_host_status: dict[str, HostStatus] = {}
+_placements: dict[str, Placement] = {}
+# Lab most recently switched to; during an overlapped switch two labs run briefly
+_active_lab_id: Optional[str] = None
+_state_lock = threading.Lock()
+# Held for a whole lab switch (or stop-all), including the background stop of
+# the previous lab, so switches never act on each other's labs halfway through.
+_switch_lock = threading.Lock()
+
+
+def docker_client(host: Optional[DockerHost] = None) -> docker.DockerClient:
+    """
+    One client per host, reused across requests. Without a host this is the
+    first host in the pool (the local daemon unless WWC_DOCKER_HOSTS says otherwise).
+    """
+    host = host or HOSTS[0]
+    client = _clients.get(host.name)
+    if client is None:
+        # Created with the short timeout: the client asks the daemon for its API
+        # version right away, which shouldn't hang on an unreachable host.
+        if host.is_local:
+            client = docker.from_env(timeout=HOST_TIMEOUT)
+        else:
+            client = docker.DockerClient(base_url=host.base_url, timeout=HOST_TIMEOUT)
+        client.api.timeout = 60
+        with _state_lock:
+            client = _clients.setdefault(host.name, client)
+    return client
+
+
+def check_host(host: DockerHost, max_age: float = HOST_CHECK_TTL) -> HostStatus:
+    """
+    Health and load of one daemon (ping + info), cached for max_age seconds so
+    page loads and placement don't ping every host every time.
+    """
+    cached = _host_status.get(host.name)
+    now = time.time()
+    if cached is not None and now - cached.checked_at < max_age:
+        return cached
+
+    try:
+        # Reuse the host's pooled client, with a short per-request timeout so an
+        # unreachable host doesn't stall page loads for the client's full 60 s.
+        api = docker_client(host).api
+        resp = api.get(f"{api.base_url}/v{api.api_version}/info", timeout=HOST_TIMEOUT)
+        resp.raise_for_status()
+        info = resp.json()
+        status = HostStatus(
+            host=host,
+            healthy=True,
+            running=int(info.get("ContainersRunning", 0)),
+            mem_total=int(info.get("MemTotal", 0)),
+            checked_at=now,
+        )
+    except (DockerException, RequestException, OSError, ValueError) as e:
+        status = HostStatus(host=host, healthy=False, error=str(e), checked_at=now)
+        # Start over with a fresh client (and connections) once the host is back.
+        # Not closed here: log and stats followers may still be reading from it.
+        with _state_lock:
+            _clients.pop(host.name, None)
+            _drop_placements(host)
+
+    with _state_lock:
+        _host_status[host.name] = status
+    return status
+
+
+def _drop_placements(host: DockerHost) -> None:
+    """
+    Forgets labs placed on a host that went down (caller holds _state_lock),
+    so status and the proxy report them as stopped. running_labs() places
+    them again once the host is back.
+    """
+    for lab_id in [lab_id for lab_id, p in _placements.items() if p.host.name == host.name]:
+        del _placements[lab_id]
+
+
+def _mark_unhealthy(host: DockerHost, error: str) -> None:
+    with _state_lock:
+        _host_status[host.name] = HostStatus(host=host, healthy=False, error=error, checked_at=time.time())
+        _drop_placements(host)
+
+
+def host_statuses() -> list[dict]:
+    rows = []
+    for host in HOSTS:
+        s = check_host(host)
+        rows.append(
+            {
+                "name": host.name,
+                "url": host.base_url or "local",
+                "address": host.address,
+                "healthy": s.healthy,
+                "error": s.error,
+                "running_containers": s.running,
+                "mem_total_gib": round(s.mem_total / 2**30, 1),
+                "labs": sorted(lab_id for lab_id, p in _placements.items() if p.host.name == host.name),
+            }
+        )
+    return rows
+
+
+def _placement_candidates() -> list[HostStatus]:
+    """Healthy hosts, least loaded first; ties keep WWC_DOCKER_HOSTS order."""
+    statuses = [check_host(h) for h in HOSTS]
+    healthy = [s for s in statuses if s.healthy]
+    return sorted(healthy, key=lambda s: s.load)
+
+
+def _placement_from_container(lab: LabSpec, host: DockerHost, c) -> Placement:
+    container_port = lab.ports[0].container_port if lab.ports else 5000
+    if host.is_local:
+        return Placement(host=host, upstream=f"http://{lab.container_name}:{container_port}")
+
+    bindings = (c.ports or {}).get(f"{container_port}/tcp") or []
+    published = next((b.get("HostPort") for b in bindings if b.get("HostPort")), None)
+    if not published:
+        raise RuntimeError(f"{lab.container_name} on {host.name} has no published port for {container_port}/tcp.")
+    url = f"http://{host.address}:{published}"
+    return Placement(host=host, upstream=url, direct_url=f"{url}/")
 
 
-def docker_client():
-    return docker.from_env()
+def get_placement(lab_id: str) -> Optional[Placement]:
+    return _placements.get(lab_id)
+
+
+def lab_upstream(lab: LabSpec) -> Optional[str]:
+    """
+    Where the proxy sends /lab/<id>/: the host the lab was placed on, or the
+    container name on the local lab network if the hub hasn't placed it.
+    """
+    placement = _placements.get(lab.id)
+    if placement is not None:
+        return placement.upstream
+    if not lab.ports:
+        return None
+    return f"http://{lab.container_name}:{lab.ports[0].container_port}"
 
 
 def load_labs() -> list[LabSpec]:
@@ -41,7 +279,7 @@ def load_labs() -> list[LabSpec]:
     labs: list[LabSpec] = []
     for lab in raw.get("labs", []):
         ports = [
-            LabPort(container_port=p["container_port"], host_port=p["host_port"])
+            LabPort(container_port=p["container_port"], host_port=p.get("host_port"))
             for p in lab.get("ports", [])
         ]
 
@@ -54,34 +292,64 @@ def load_labs() -> list[LabSpec]:
                 image=lab["image"],
                 ports=ports,
                 launch_url=lab["launch_url"],
+                path=lab.get("path", ""),
             )
         )
     return labs
 
 
-def get_running_lab_id() -> Optional[str]:
-    client = docker_client()
-    labs = load_labs()
-    for lab in labs:
+def running_labs(labs: list[LabSpec]) -> list[tuple[LabSpec, DockerHost]]:
+    """
+    Running lab containers across all healthy hosts. Also re-learns placements
+    after a hub restart, so the proxy finds labs on remote hosts again.
+    """
+    by_name = {lab.container_name: lab for lab in labs}
+    found: list[tuple[LabSpec, DockerHost]] = []
+    for host in HOSTS:
+        if not check_host(host).healthy:
+            continue
         try:
-            c = client.containers.get(lab.container_name)
-            c.reload()
-            if c.status == "running":
-                return lab.id
-        except NotFound:
+            containers = docker_client(host).containers.list()
+        except (DockerException, RequestException) as e:
+            _mark_unhealthy(host, str(e))
             continue
-    return None
+        for c in containers:
+            lab = by_name.get(c.name)
+            if lab is None:
+                continue
+            found.append((lab, host))
+            placed = _placements.get(lab.id)
+            if placed is None or placed.host.name != host.name:
+                try:
+                    placement = _placement_from_container(lab, host, c)
+                except RuntimeError:
+                    continue
+                with _state_lock:
+                    _placements[lab.id] = placement
+    return found
+
+
+def get_running_lab_id() -> Optional[str]:
+    running = [lab.id for lab, _ in running_labs(load_labs())]
+    if _active_lab_id in running:
+        return _active_lab_id
+    return running[0] if running else None
+
 
+def get_lab_host(lab_id: Optional[str]) -> Optional[str]:
+    placement = _placements.get(lab_id) if lab_id else None
+    return placement.host.name if placement else None
 
-def _stop_container_if_running(container_name: str, timeout: int = 5) -> bool:
+
+def _stop_container_if_running(container_name: str, timeout: int = 5, host: Optional[DockerHost] = None) -> bool:
     """
-    Returns True if a running container was stopped, else False.
+    Returns True if a running (or idle-paused) container was stopped, else False.
     """
-    client = docker_client()
+    client = docker_client(host)
     try:
         c = client.containers.get(container_name)
         c.reload()
-        if c.status == "running":
+        if c.status in ("running", "paused"):
             c.stop(timeout=timeout)
             return True
     except NotFound:
@@ -89,21 +357,63 @@ def _stop_container_if_running(container_name: str, timeout: int = 5) -> bool:
     return False
 
 
+def stop_lab(lab: LabSpec) -> list[DockerHost]:
+    """Stops a lab's container on every healthy host; returns the hosts it was running on."""
+    stopped = []
+    for host in HOSTS:
+        if not check_host(host).healthy:
+            continue
+        try:
+            if _stop_container_if_running(lab.container_name, host=host):
+                stopped.append(host)
+        except (DockerException, RequestException) as e:
+            _mark_unhealthy(host, str(e))
+    with _state_lock:
+        _placements.pop(lab.id, None)
+    return stopped
+
+
+def _stop_in_background(labs: list[LabSpec]) -> threading.Thread:
+    """
+    Stops labs on a background thread, so a switch doesn't wait for `docker stop`.
+    The caller holds the switch lock; it is handed to this thread and released
+    once the labs are stopped, so the next switch waits for them.
+    """
+
+    def run() -> None:
+        try:
+            for lab in labs:
+                if lab.id != _active_lab_id:
+                    stop_lab(lab)
+        finally:
+            _switch_lock.release()
+
+    thread = threading.Thread(target=run, name="lab-switch-stop", daemon=True)
+    thread.start()
+    return thread
+
+
+def _acquire_switch_lock() -> Iterator[dict]:
+    if not _switch_lock.acquire(blocking=False):
+        yield {"type": "step", "message": "Waiting for another lab start or stop to finish..."}
+        _switch_lock.acquire()
+
+
 def stop_all_labs(labs: list[LabSpec]) -> None:
     for lab in labs:
-        _stop_container_if_running(lab.container_name)
+        stop_lab(lab)
 
 
-def _ensure_image_exists(image: str) -> None:
+def _ensure_image_exists(image: str, host: Optional[DockerHost] = None) -> None:
     """
     Hub does NOT build images. Images must be built via docker compose.
     """
-    client = docker_client()
+    client = docker_client(host)
     client.images.get(image)
 
 
-def _remove_existing_container_if_present(container_name: str) -> None:
-    client = docker_client()
+def _remove_existing_container_if_present(container_name: str, host: Optional[DockerHost] = None) -> None:
+    client = docker_client(host)
     try:
         existing = client.containers.get(container_name)
         existing.reload()
@@ -113,20 +423,48 @@ def _remove_existing_container_if_present(container_name: str) -> None:
         return
 
 
-def _start_container(lab: LabSpec) -> None:
-    client = docker_client()
-    port_map = {f"{p.container_port}/tcp": p.host_port for p in lab.ports}
+def _ensure_network(host: Optional[DockerHost] = None) -> None:
+    """
+    docker compose creates the lab network with the hub; create it here too so
+    a hub started some other way can still attach labs to it.
+    """
+    client = docker_client(host)
+    try:
+        client.networks.get(LAB_NETWORK)
+    except NotFound:
+        client.networks.create(LAB_NETWORK, driver="bridge")
+
+
+def _start_container(lab: LabSpec, host: Optional[DockerHost] = None) -> Placement:
+    host = host or HOSTS[0]
+    client = docker_client(host)
+    port_map = {f"{p.container_port}/tcp": p.host_port for p in lab.ports if p.host_port}
+
+    if host.is_local:
+        _ensure_network(host)
+        network = LAB_NETWORK
+    else:
+        # The hub can't join a remote host's bridge network, so publish the
+        # lab port on an ephemeral host port and proxy to that instead.
+        for p in lab.ports:
+            port_map.setdefault(f"{p.container_port}/tcp", None)
+        network = None
 
-    client.containers.run(
+    c = client.containers.run(
         lab.image,
         name=lab.container_name,
         detach=True,
         ports=port_map,
+        network=network,
         restart_policy={"Name": "no"},
+        labels={"wwc2025.lab": lab.id},
+        environment={k: os.environ[k] for k in LAB_ENV_PASSTHROUGH if k in os.environ},
     )
+    c.reload()
+    return _placement_from_container(lab, host, c)
 
 
-def _wait_for_ready(container_name: str, seconds: float = 30.0) -> str:
+def _wait_for_ready(container_name: str, seconds: float = 30.0, host: Optional[DockerHost] = None) -> str:
     """
     Wait until:
       1) container status is 'running', AND
@@ -138,7 +476,7 @@ def _wait_for_ready(container_name: str, seconds: float = 30.0) -> str:
 
     This avoids "launching too early" without making host-network assumptions.
     """
-    client = docker_client()
+    client = docker_client(host)
     deadline = time.time() + seconds
 
     last_status = None
@@ -159,6 +497,11 @@ def _wait_for_ready(container_name: str, seconds: float = 30.0) -> str:
                 saw_health = True
                 last_health = health.get("Status")
 
+            if c.status in ("exited", "dead"):
+                # Crashed on startup (bad data file, import error...); no point waiting
+                code = state.get("ExitCode")
+                raise RuntimeError(f"Container exited during startup (exit code {code}).")
+
             if c.status != "running":
                 time.sleep(0.25)
                 continue
@@ -187,76 +530,72 @@ def _wait_for_ready(container_name: str, seconds: float = 30.0) -> str:
 
 
 def start_lab(lab_id: str) -> LabSpec:
-    labs = load_labs()
-    lab = next((l for l in labs if l.id == lab_id), None)
+    lab = next((l for l in load_labs() if l.id == lab_id), None)
     if not lab:
         raise ValueError(f"Unknown lab_id: {lab_id}")
 
-    stop_all_labs(labs)
-
-    try:
-        _ensure_image_exists(lab.image)
-    except Exception:
-        raise ValueError(
-            f"Lab image not found locally: {lab.image}. "
-            f"Build it with: docker compose build {lab.id}  (or: docker compose --profile labs build)"
-        )
-
-    _remove_existing_container_if_present(lab.container_name)
-    _start_container(lab)
-
-    _wait_for_ready(lab.container_name)
+    for ev in start_lab_steps(lab_id):
+        if ev["type"] == "error":
+            raise ValueError(ev["message"])
 
     return lab
 
 
-def start_lab_steps(lab_id: str) -> Iterator[dict]:
+def _start_on_host(lab: LabSpec, host: DockerHost) -> Iterator[dict]:
     """
-    Yields dict events suitable for SSE streaming to the UI.
+    Starts the lab on one host. Yields step events, then exactly one of
+    {"type": "placed", ...} or {"type": "failed", "message": ...}.
     """
-    labs = load_labs()
-    lab = next((l for l in labs if l.id == lab_id), None)
-    if not lab:
-        yield {"type": "error", "message": f"Unknown lab_id: {lab_id}"}
-        return
-
-    yield {"type": "step", "message": "Stopping any other running labs..."}
-    for other in labs:
-        if other.id == lab.id:
-            continue
-        stopped = _stop_container_if_running(other.container_name)
-        if stopped:
-            yield {"type": "step", "message": f"Stopped {other.title}."}
-
     yield {"type": "step", "message": f"Ensuring image exists: {lab.image} ..."}
     try:
-        _ensure_image_exists(lab.image)
-        yield {"type": "step", "message": "Image found locally."}
-    except Exception:
+        _ensure_image_exists(lab.image, host)
+        yield {"type": "step", "message": "Image found locally." if len(HOSTS) == 1 else f"Image found on {host.name}."}
+    except NotFound:
         yield {
-            "type": "error",
+            "type": "failed",
             "message": (
-                f"Image not found: {lab.image}. "
-                f"Build lab images with: docker compose build {lab.id}  (or: docker compose --profile labs build)"
+                f"Image not found: {lab.image}"
+                + ("" if len(HOSTS) == 1 else f" on {host.name}")
+                + f". Build lab images with: docker compose build {lab.id}  (or: docker compose --profile labs build)"
             ),
         }
         return
+    except (DockerException, RequestException) as e:
+        _mark_unhealthy(host, str(e))
+        yield {"type": "failed", "message": f"Docker host {host.name} is unreachable: {e}"}
+        return
 
     yield {"type": "step", "message": "Cleaning up any previous stopped container..."}
-    _remove_existing_container_if_present(lab.container_name)
+    try:
+        _remove_existing_container_if_present(lab.container_name, host)
+    except (DockerException, RequestException) as e:
+        yield {"type": "failed", "message": f"Failed to clean up previous container: {e}"}
+        return
+
+    # Imported here: lab_logs uses this module's types at import time
+    from . import lab_logs
 
     yield {"type": "step", "message": f"Starting container: {lab.container_name} ..."}
     try:
-        _start_container(lab)
+        placement = _start_container(lab, host)
+    except RuntimeError as e:
+        # Started, but without a reachable port
+        _stop_container_if_running(lab.container_name, host=host)
+        yield {"type": "failed", "message": str(e)}
+        return
     except Exception as e:
-        yield {"type": "error", "message": f"Failed to start container: {e}"}
+        yield {"type": "failed", "message": f"Failed to start container: {e}"}
         return
 
+    # Capture the lab's own output from the first line, for the failure report below
+    lab_logs.follow(lab, host)
+
     yield {"type": "step", "message": "Waiting for container readiness (running/healthy)..."}
     try:
-        mode = _wait_for_ready(lab.container_name)
+        mode = _wait_for_ready(lab.container_name, host=host)
     except Exception as e:
-        yield {"type": "error", "message": str(e)}
+        _stop_container_if_running(lab.container_name, host=host)
+        yield {"type": "failed", "message": str(e), "logs": lab_logs.failure_tail(lab.id)}
         return
 
     if mode == "healthy":
@@ -264,19 +603,150 @@ def start_lab_steps(lab_id: str) -> Iterator[dict]:
     else:
         yield {"type": "step", "message": "Container is running (no healthcheck detected)."}
 
-    yield {"type": "done", "message": "Lab is ready.", "launch_url": lab.launch_url}
+    yield {"type": "placed", "placement": placement}
+
+
+def start_lab_steps(lab_id: str) -> Iterator[dict]:
+    """
+    Yields dict events suitable for SSE streaming to the UI.
+
+    In overlap mode the previously running lab keeps serving while the new
+    one starts; it is stopped in the background once the new lab is ready,
+    and left running if the new lab fails to start.
+    """
+    labs = load_labs()
+    lab = next((l for l in labs if l.id == lab_id), None)
+    if not lab:
+        yield {"type": "error", "message": f"Unknown lab_id: {lab_id}"}
+        return
+
+    yield from _acquire_switch_lock()
+    handed_off = False
+    try:
+        for ev in _switch_steps(lab, labs):
+            if ev["type"] == "drain":
+                # The background stop releases the lock when it's done
+                _stop_in_background(ev["labs"])
+                handed_off = True
+                continue
+            yield ev
+    finally:
+        if not handed_off:
+            _switch_lock.release()
+
+
+def _other_running(lab: LabSpec, labs: list[LabSpec]) -> list[LabSpec]:
+    return list({other.id: other for other, _ in running_labs(labs) if other.id != lab.id}.values())
+
+
+def _switch_steps(lab: LabSpec, labs: list[LabSpec]) -> Iterator[dict]:
+    """
+    start_lab_steps with the switch lock held. Besides the SSE events, yields
+    {"type": "drain", "labs": [...]} once for labs to stop in the background.
+    """
+    global _active_lab_id
+
+    previous: list[LabSpec] = []
+    if SWITCH_MODE == "overlap":
+        previous = _other_running(lab, labs)
+        if previous:
+            titles = ", ".join(other.title for other in previous)
+            yield {"type": "step", "message": f"Keeping {titles} running until {lab.title} is ready..."}
+    else:
+        yield {"type": "step", "message": "Stopping any other running labs..."}
+        for other in labs:
+            for host in stop_lab(other) if other.id != lab.id else []:
+                where = "" if len(HOSTS) == 1 else f" on {host.name}"
+                yield {"type": "step", "message": f"Stopped {other.title}{where}."}
+    # Never leave the same lab running on two hosts (and the container name must be free)
+    stop_lab(lab)
+
+    candidates = _placement_candidates()
+    if not candidates:
+        down = "; ".join(f"{h.name}: {check_host(h).error}" for h in HOSTS)
+        yield {"type": "error", "message": f"No Docker host is reachable ({down})."}
+        return
+
+    failures: list[tuple[str, str]] = []
+    failure_logs: list[str] = []
+    for status in candidates:
+        host = status.host
+        if len(HOSTS) > 1:
+            yield {
+                "type": "step",
+                "message": (
+                    f"Placing on {host.name} ({status.running} running containers, "
+                    f"{status.mem_total / 2**30:.1f} GiB)..."
+                ),
+            }
+
+        placement = None
+        for ev in _start_on_host(lab, host):
+            if ev["type"] == "placed":
+                placement = ev["placement"]
+            elif ev["type"] == "failed":
+                failures.append((host.name, ev["message"]))
+                failure_logs = ev.get("logs") or failure_logs
+                if len(candidates) > 1:
+                    yield {"type": "step", "message": f"{host.name} failed: {ev['message']}"}
+            else:
+                yield ev
+
+        if placement is not None:
+            with _state_lock:
+                _placements[lab.id] = placement
+                _active_lab_id = lab.id
+            # Whatever else is running now, not what was running when the switch began
+            previous = _other_running(lab, labs)
+            if previous:
+                yield {"type": "drain", "labs": previous}
+                titles = ", ".join(other.title for other in previous)
+                yield {"type": "step", "message": f"Stopping {titles} in the background."}
+            done = {"type": "done", "message": "Lab is ready.", "launch_url": lab.launch_url, "host": host.name}
+            if len(HOSTS) > 1:
+                done["message"] = f"Lab is ready on {host.name}."
+            if placement.direct_url:
+                done["direct_url"] = placement.direct_url
+            yield done
+            return
+
+    if len(failures) == 1:
+        error = {"type": "error", "message": failures[0][1]}
+    else:
+        detail = " | ".join(f"{name}: {message}" for name, message in failures)
+        error = {"type": "error", "message": f"Could not start the lab on any host. {detail}"}
+    if failure_logs:
+        # The lab's own last output lines (last failed host), e.g. a traceback
+        error["logs"] = failure_logs
+    still_running = _other_running(lab, labs) if previous else []
+    if still_running:
+        titles = ", ".join(other.title for other in still_running)
+        error["message"] += f" ({titles} is still running.)"
+    yield error
 
 
 def stop_all_labs_steps() -> Iterator[dict]:
+    yield from _acquire_switch_lock()
+    try:
+        yield from _stop_all_steps()
+    finally:
+        _switch_lock.release()
+
+
+def _stop_all_steps() -> Iterator[dict]:
+    global _active_lab_id
+
     labs = load_labs()
+    with _state_lock:
+        _active_lab_id = None
     yield {"type": "step", "message": "Stopping all labs..."}
 
     any_stopped = False
     for lab in labs:
-        stopped = _stop_container_if_running(lab.container_name)
-        if stopped:
+        for host in stop_lab(lab):
             any_stopped = True
-            yield {"type": "step", "message": f"Stopped {lab.title}."}
+            where = "" if len(HOSTS) == 1 else f" on {host.name}"
+            yield {"type": "step", "message": f"Stopped {lab.title}{where}."}
 
     if not any_stopped:
         yield {"type": "step", "message": "No running lab containers were found."}
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import importlib.util
+import sys
+import threading
+from dataclasses import replace
+from html import escape
+from typing import Iterator, Optional
+
+from flask import Flask
+from werkzeug.middleware.dispatcher import DispatcherMiddleware
+
+from . import docker_control
+from .docker_control import LabSpec
+
+# In-process runtime: every lab's Flask app is imported into the hub process and
+# mounted under /lab/<id>/. "Starting" a lab only enables its mount, so switching
+# labs costs no container start, no healthcheck wait and no extra interpreter.
+
+_lock = threading.Lock()
+_running_lab_id: Optional[str] = None
+_load_errors: dict[str, str] = {}
+
+
+def lab_prefix(lab_id: str) -> str:
+    return f"/lab/{lab_id}"
+
+
+def load_labs() -> list[LabSpec]:
+    """
+    Same registry as the Docker runtime, with launch URLs pointing at the
+    hub's own mounts instead of per-lab host ports.
+    """
+    return [replace(lab, launch_url=f"{lab_prefix(lab.id)}/") for lab in docker_control.load_labs()]
+
+
+def _import_lab_app(lab: LabSpec) -> Flask:
+    lab_dir = docker_control.LABS_JSON_PATH.parent / lab.path
+    app_py = lab_dir / "app" / "app.py"
+    if not lab.path or not app_py.exists():
+        raise FileNotFoundError(f"Missing lab source at {app_py}. Check the 'path' of {lab.id} in labs.json.")
+
+    # Labs import their sibling modules (e.g. lab2's strength.py) as top-level
+    # names, exactly as they do when run as /app/app/app.py in their container.
+    app_dir = str(app_py.parent)
+    if app_dir not in sys.path:
+        sys.path.append(app_dir)
+
+    # Every lab's module is called app.py, so each gets its own module name.
+    name = f"wwc2025_{lab.id}_app"
+    spec = importlib.util.spec_from_file_location(name, app_py)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+
+    return module.create_app(data_dir=lab_dir / "data")
+
+
+class _LabMount:
+    """WSGI wrapper that serves a mounted lab only while it is the running one."""
+
+    def __init__(self, lab: LabSpec, lab_app: Flask):
+        self.lab = lab
+        self.lab_app = lab_app
+
+    def __call__(self, environ, start_response):
+        if _running_lab_id == self.lab.id:
+            # Labs trust X-Forwarded-* from the Docker runtime's proxy. Mounted
+            # here, DispatcherMiddleware already set SCRIPT_NAME, and anything
+            # forwarded came straight from the client, so drop it.
+            environ = {k: v for k, v in environ.items() if not k.startswith("HTTP_X_FORWARDED_")}
+            return self.lab_app(environ, start_response)
+
+        title = escape(self.lab.title)
+        body = (
+            f"<!doctype html><title>{title}</title>"
+            f"<p>{title} is not running. Start it from the <a href=\"/\">Lab Hub</a>.</p>"
+        ).encode("utf-8")
+        start_response(
+            "503 Service Unavailable",
+            [("Content-Type", "text/html; charset=utf-8"), ("Content-Length", str(len(body)))],
+        )
+        return [body]
+
+
+def mount_labs(app: Flask) -> None:
+    """
+    Imports every lab once and mounts it under /lab/<id>/ in front of the hub.
+    A lab that fails to import is reported when someone tries to start it.
+    """
+    mounts = {}
+    for lab in load_labs():
+        try:
+            mounts[lab_prefix(lab.id)] = _LabMount(lab, _import_lab_app(lab))
+        except Exception as e:
+            _load_errors[lab.id] = f"{type(e).__name__}: {e}"
+            app.logger.error("In-process lab %s failed to load: %s", lab.id, _load_errors[lab.id])
+
+    app.wsgi_app = DispatcherMiddleware(app.wsgi_app, mounts)
+
+
+def get_running_lab_id() -> Optional[str]:
+    return _running_lab_id
+
+
+def get_lab_host(lab_id: Optional[str]) -> Optional[str]:
+    return "hub (in-process)" if lab_id and lab_id == _running_lab_id else None
+
+
+def host_statuses() -> list[dict]:
+    return [
+        {
+            "name": "hub (in-process)",
+            "url": None,
+            "address": None,
+            "healthy": True,
+            "error": "",
+            "running_containers": 0,
+            "mem_total_gib": None,
+            "labs": [_running_lab_id] if _running_lab_id else [],
+        }
+    ]
+
+
+def start_lab_steps(lab_id: str) -> Iterator[dict]:
+    """
+    Yields dict events suitable for SSE streaming to the UI.
+    """
+    global _running_lab_id
+
+    labs = load_labs()
+    lab = next((l for l in labs if l.id == lab_id), None)
+    if not lab:
+        yield {"type": "error", "message": f"Unknown lab_id: {lab_id}"}
+        return
+
+    if lab.id in _load_errors:
+        yield {"type": "error", "message": f"{lab.title} failed to load in-process: {_load_errors[lab.id]}"}
+        return
+
+    with _lock:
+        previous = _running_lab_id
+        _running_lab_id = lab.id
+
+    if previous and previous != lab.id:
+        title = next((l.title for l in labs if l.id == previous), previous)
+        yield {"type": "step", "message": f"Disabled {title}."}
+
+    yield {"type": "step", "message": f"Enabled {lab.title} (in-process, no container)."}
+    yield {"type": "done", "message": "Lab is ready.", "launch_url": lab.launch_url}
+
+
+def stop_all_labs_steps() -> Iterator[dict]:
+    global _running_lab_id
+
+    yield {"type": "step", "message": "Stopping all labs..."}
+
+    with _lock:
+        previous = _running_lab_id
+        _running_lab_id = None
+
+    if previous:
+        title = next((l.title for l in load_labs() if l.id == previous), previous)
+        yield {"type": "step", "message": f"Disabled {title}."}
+    else:
+        yield {"type": "step", "message": "No running labs were found."}
+
+    yield {"type": "done", "message": "All labs stopped."}
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import os
+import threading
+from collections import deque
+from typing import Iterator, Optional
+
+from docker.errors import DockerException, NotFound
+from requests.exceptions import RequestException
+
+from . import docker_control
+from .docker_control import DockerHost, LabSpec
+
+# Lab container logs (Docker runtime). A follower thread per lab copies the
+# container's stdout/stderr into a fixed-size ring of lines. The hub follows a
+# lab from the moment it starts, so a failed start can show what the lab
+# printed, and /api/labs/<id>/logs streams the same ring to any number of
+# clients. Each client only keeps a cursor into the ring: a client that reads
+# slower than the lab writes is told how many lines it missed instead of the
+# hub queueing them, so a noisy lab costs at most WWC_LOG_LINES lines of memory.
+
+LOG_LINES = int(os.environ.get("WWC_LOG_LINES", "500"))
+FAILURE_LOG_LINES = int(os.environ.get("WWC_FAILURE_LOG_LINES", "20"))
+
+MAX_LINE_CHARS = 2000
+MAX_BATCH = 200  # lines per SSE event
+
+
+class LogBuffer:
+    def __init__(self, maxlen: int = LOG_LINES):
+        self.lines: deque = deque(maxlen=maxlen)  # (seq, line)
+        self.seq = 0
+        # First line of the current container run (its "started" marker)
+        self.run_seq = 1
+        self.generation = 0
+        self.follower: Optional[threading.Thread] = None
+        self.cv = threading.Condition()
+
+    def append(self, line: str) -> None:
+        if len(line) > MAX_LINE_CHARS:
+            line = line[:MAX_LINE_CHARS] + " …"
+        with self.cv:
+            self.seq += 1
+            self.lines.append((self.seq, line))
+            self.cv.notify_all()
+
+    def tail(self, n: int, current_run: bool = False) -> list[str]:
+        with self.cv:
+            first = self.run_seq if current_run else 0
+            lines = [line for seq, line in self.lines if seq >= first]
+        return lines[-n:] if n > 0 else []
+
+    def read(self, cursor: int, timeout: float) -> tuple[list[tuple[int, str]], int, int]:
+        """
+        Lines after `cursor`, waiting up to `timeout` for new ones. Returns
+        (lines, dropped, new cursor); dropped counts lines that left the ring
+        before this reader got to them.
+        """
+        with self.cv:
+            if self.seq <= cursor:
+                self.cv.wait(timeout)
+            if not self.lines:
+                return [], 0, cursor
+            oldest = self.lines[0][0]
+            dropped = max(0, oldest - cursor - 1)
+            start = max(cursor + 1, oldest) - oldest
+            batch = [self.lines[i] for i in range(start, min(start + MAX_BATCH, len(self.lines)))]
+        return batch, dropped, batch[-1][0] if batch else max(cursor, oldest - 1)
+
+
+_lock = threading.Lock()
+_buffers: dict[str, LogBuffer] = {}
+
+
+def buffer(lab_id: str) -> LogBuffer:
+    with _lock:
+        buf = _buffers.get(lab_id)
+        if buf is None:
+            buf = _buffers[lab_id] = LogBuffer()
+        return buf
+
+
+def _follow(lab: LabSpec, host: DockerHost, buf: LogBuffer, generation: int, tail) -> None:
+    partial = b""
+    try:
+        c = docker_control.docker_client(host).containers.get(lab.container_name)
+        for chunk in c.logs(stream=True, follow=True, tail=tail):
+            if buf.generation != generation:
+                return
+            partial += chunk
+            *complete, partial = partial.split(b"\n")
+            for raw in complete:
+                buf.append(raw.decode("utf-8", "replace").rstrip("\r"))
+            if len(partial) > MAX_LINE_CHARS:
+                buf.append(partial.decode("utf-8", "replace"))
+                partial = b""
+    except (NotFound, DockerException, RequestException, OSError) as e:
+        if buf.generation == generation:
+            buf.append(f"--- log stream ended: {e} ---")
+    finally:
+        if partial and buf.generation == generation:
+            buf.append(partial.decode("utf-8", "replace"))
+
+
+def follow(lab: LabSpec, host: DockerHost, tail="all") -> LogBuffer:
+    """
+    Starts following a lab container's logs, replacing any previous follower.
+    Called right after the container is created, so "all" is just this run.
+    """
+    buf = buffer(lab.id)
+    with buf.cv:
+        buf.generation += 1
+        generation = buf.generation
+        buf.run_seq = buf.seq + 1
+    where = "" if len(docker_control.HOSTS) == 1 else f" on {host.name}"
+    buf.append(f"--- {lab.container_name}{where} ---")
+
+    thread = threading.Thread(
+        target=_follow, args=(lab, host, buf, generation, tail), name=f"logs-{lab.id}", daemon=True
+    )
+    buf.follower = thread
+    thread.start()
+    return buf
+
+
+def ensure_following(lab: LabSpec) -> LogBuffer:
+    """Attaches to a lab that is already running (e.g. after a hub restart)."""
+    buf = buffer(lab.id)
+    if buf.follower is not None and buf.follower.is_alive():
+        return buf
+    for running, host in docker_control.running_labs([lab]):
+        return follow(running, host, tail=LOG_LINES)
+    return buf
+
+
+def failure_tail(lab_id: str, n: int = FAILURE_LOG_LINES, wait: float = 2.0) -> list[str]:
+    """
+    Last lines of the current run, for a failed start. The container has been
+    stopped by then, so give the follower a moment to drain its stream.
+    """
+    buf = buffer(lab_id)
+    if buf.follower is not None:
+        buf.follower.join(wait)
+    lines = buf.tail(LOG_LINES, current_run=True)[1:]  # without the run marker
+    return lines[-n:] if n > 0 else []
+
+
+def stream(lab_id: str, tail: int = 100, keepalive: float = 25.0) -> Iterator[Optional[dict]]:
+    """
+    Yields log events for one client: the last `tail` lines, then new lines as
+    they arrive. Yields None every `keepalive` seconds without output.
+    """
+    buf = buffer(lab_id)
+    with buf.cv:
+        oldest = buf.lines[0][0] if buf.lines else buf.seq + 1
+        cursor = max(buf.seq - max(tail, 0), oldest - 1)
+
+    while True:
+        lines, dropped, cursor = buf.read(cursor, keepalive)
+        if dropped:
+            yield {"type": "dropped", "count": dropped, "message": f"{dropped} lines skipped (reader too slow)."}
+        if lines:
+            yield {"type": "log", "seq": lines[-1][0], "lines": [line for _, line in lines]}
+        elif not dropped:
+            yield None
@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from html import escape
+from typing import Iterator, Optional
+
+import urllib3
+from flask import Request, Response
+from server_timing import phase
+
+from . import docker_control, reaper
+from .docker_control import LabSpec
+
+# Reverse proxy for /lab/<id>/... -> the lab container on the Docker network.
+#
+# One PoolManager keeps a keep-alive pool per upstream (host, port), so a class
+# of students clicking around a lab reuses a handful of TCP connections instead
+# of opening one per request. Bodies are streamed in both directions.
+
+POOL_MAXSIZE = int(os.environ.get("WWC_PROXY_POOL_SIZE", "32"))
+CHUNK_SIZE = 64 * 1024
+LATENCY_WINDOW = 1024
+
+_pool = urllib3.PoolManager(
+    num_pools=16,
+    maxsize=POOL_MAXSIZE,
+    # Past maxsize, extra connections are opened and closed rather than blocking students.
+    block=False,
+    retries=False,
+    timeout=urllib3.Timeout(connect=2.0, read=60.0),
+)
+
+# RFC 9110 §7.6.1 connection-specific headers; never forwarded in either direction.
+HOP_BY_HOP = frozenset(
+    {
+        "connection",
+        "keep-alive",
+        "proxy-authenticate",
+        "proxy-authorization",
+        "proxy-connection",
+        "te",
+        "trailer",
+        "transfer-encoding",
+        "upgrade",
+    }
+)
+# Set again by the hub's own server, so the lab's copies would be duplicates
+RESPONSE_STRIPPED = HOP_BY_HOP | {"server", "date"}
+
+
+@dataclass
+class LabProxyStats:
+    requests: int = 0
+    errors: int = 0
+    in_flight: int = 0
+    bytes_out: int = 0
+    status: dict[int, int] = field(default_factory=dict)
+    # Recent total request durations (ms), first byte to last byte
+    latencies_ms: deque = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW))
+    # Recent time-to-first-byte from the lab (ms)
+    ttfb_ms: deque = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW))
+    last_request_at: Optional[float] = None
+
+
+_stats_lock = threading.Lock()
+_stats: dict[str, LabProxyStats] = {}
+
+
+def _lab_stats(lab_id: str) -> LabProxyStats:
+    with _stats_lock:
+        s = _stats.get(lab_id)
+        if s is None:
+            s = _stats[lab_id] = LabProxyStats()
+        return s
+
+
+_labs_cache: tuple[float, dict[str, LabSpec]] = (0.0, {})
+
+
+def find_lab(lab_id: str) -> Optional[LabSpec]:
+    """
+    Registry lookup for the proxy hot path: labs.json is only re-read when its
+    mtime changes, not on every proxied request.
+    """
+    global _labs_cache
+    mtime = docker_control.LABS_JSON_PATH.stat().st_mtime
+    if mtime != _labs_cache[0]:
+        _labs_cache = (mtime, {lab.id: lab for lab in docker_control.load_labs()})
+    return _labs_cache[1].get(lab_id)
+
+
+def request_count(lab_id: str) -> int:
+    s = _stats.get(lab_id)
+    return s.requests if s else 0
+
+
+def last_request_at(lab_id: str) -> Optional[float]:
+    s = _stats.get(lab_id)
+    return s.last_request_at if s else None
+
+
+def upstream_base(lab: LabSpec) -> Optional[str]:
+    """
+    Local labs are reached by container name on the shared lab network;
+    labs placed on another Docker host by that host's published port.
+    """
+    return docker_control.lab_upstream(lab)
+
+
+def _forward_headers(req: Request, prefix: str) -> dict[str, str]:
+    headers = {k: v for k, v in req.headers.items() if k.lower() not in HOP_BY_HOP and k.lower() != "host"}
+
+    # Labs run ProxyFix, so url_for() and redirects come back with the /lab/<id> prefix.
+    client = req.remote_addr or ""
+    prior = req.headers.get("X-Forwarded-For")
+    headers["X-Forwarded-For"] = f"{prior}, {client}" if prior else client
+    headers["X-Forwarded-Proto"] = req.scheme
+    headers["X-Forwarded-Host"] = req.host
+    headers["X-Forwarded-Prefix"] = prefix
+    return headers
+
+
+def _error_page(status: int, lab: LabSpec, message: str) -> Response:
+    title = escape(lab.title)
+    body = (
+        f"<!doctype html><title>{title}</title>"
+        f"<p>{title}: {escape(message)} Start it from the <a href=\"/\">Lab Hub</a>.</p>"
+    )
+    return Response(body, status=status, mimetype="text/html")
+
+
+def proxy_request(lab: LabSpec, path: str, req: Request) -> Response:
+    base = upstream_base(lab)
+    if base is None:
+        return _error_page(502, lab, "no container port is defined in labs.json.")
+
+    reaper.resume_if_paused(lab)
+
+    prefix = f"/lab/{lab.id}"
+    url = f"{base}/{path}"
+    query = req.query_string.decode("latin-1")
+    if query:
+        url = f"{url}?{query}"
+
+    # Stream the request body through; werkzeug limits the stream to Content-Length.
+    has_body = req.content_length or req.headers.get("Transfer-Encoding", "").lower() == "chunked"
+    body = req.stream if has_body else None
+
+    stats = _lab_stats(lab.id)
+    with _stats_lock:
+        stats.requests += 1
+        stats.in_flight += 1
+        stats.last_request_at = time.time()
+
+    started = time.perf_counter()
+    try:
+        with phase("upstream"):
+            upstream = _pool.urlopen(
+                req.method,
+                url,
+                body=body,
+                headers=_forward_headers(req, prefix),
+                chunked=body is not None and not req.content_length,
+                redirect=False,
+                preload_content=False,
+                decode_content=False,
+            )
+    except urllib3.exceptions.HTTPError:
+        with _stats_lock:
+            stats.in_flight -= 1
+            stats.errors += 1
+            stats.status[502] = stats.status.get(502, 0) + 1
+        return _error_page(502, lab, "the lab is not running or not reachable yet.")
+
+    ttfb = (time.perf_counter() - started) * 1000.0
+
+    sent = 0
+    finished = False
+
+    def body_chunks() -> Iterator[bytes]:
+        nonlocal sent, finished
+        for chunk in upstream.stream(CHUNK_SIZE, decode_content=False):
+            sent += len(chunk)
+            yield chunk
+        finished = True
+
+    def finish() -> None:
+        # Runs when the server closes the response, including when the client
+        # went away before the body was iterated at all. A fully read response
+        # hands its connection back to the pool; one abandoned mid-stream
+        # (student closed the tab) is closed instead.
+        if finished:
+            upstream.release_conn()
+        else:
+            upstream.close()
+        elapsed = (time.perf_counter() - started) * 1000.0
+        with _stats_lock:
+            stats.in_flight -= 1
+            stats.bytes_out += sent
+            stats.status[upstream.status] = stats.status.get(upstream.status, 0) + 1
+            if upstream.status >= 500:
+                stats.errors += 1
+            stats.ttfb_ms.append(ttfb)
+            stats.latencies_ms.append(elapsed)
+
+    headers = [(k, v) for k, v in upstream.headers.items() if k.lower() not in RESPONSE_STRIPPED]
+    # Not direct_passthrough: werkzeug would hand the generator to the server
+    # as is and never run the close callbacks.
+    response = Response(body_chunks(), status=upstream.status, headers=headers)
+    response.call_on_close(finish)
+    return response
+
+
+def _percentile(sorted_values: list[float], q: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    idx = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return round(sorted_values[idx], 2)
+
+
+def stats_snapshot() -> dict:
+    with _stats_lock:
+        items = [
+            (lab_id, s.requests, s.errors, s.in_flight, s.bytes_out, dict(s.status),
+             sorted(s.latencies_ms), sorted(s.ttfb_ms), s.last_request_at)
+            for lab_id, s in _stats.items()
+        ]
+
+    labs = {}
+    for lab_id, requests, errors, in_flight, bytes_out, status, lat, ttfb, last in items:
+        labs[lab_id] = {
+            "requests": requests,
+            "errors": errors,
+            "in_flight": in_flight,
+            "bytes_out": bytes_out,
+            "status": {str(k): v for k, v in sorted(status.items())},
+            "latency_ms": {
+                "window": len(lat),
+                "mean": round(sum(lat) / len(lat), 2) if lat else None,
+                "p50": _percentile(lat, 0.50),
+                "p95": _percentile(lat, 0.95),
+                "p99": _percentile(lat, 0.99),
+                "max": round(lat[-1], 2) if lat else None,
+            },
+            "ttfb_ms": {
+                "p50": _percentile(ttfb, 0.50),
+                "p95": _percentile(ttfb, 0.95),
+            },
+            "last_request_at": last,
+        }
+
+    pools = []
+    for key in _pool.pools.keys():
+        pool = _pool.pools.get(key)
+        if pool is None:
+            continue
+        pools.append(
+            {
+                "upstream": f"{key.key_scheme}://{key.key_host}:{key.key_port}",
+                "connections_opened": pool.num_connections,
+                "requests": pool.num_requests,
+            }
+        )
+
+    return {"pool_maxsize": POOL_MAXSIZE, "labs": labs, "pools": pools}
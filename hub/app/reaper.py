@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import calendar
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Iterator, Optional
+
+from docker.errors import DockerException, NotFound
+from requests.exceptions import RequestException
+
+from . import docker_control, proxy
+from .docker_control import DockerHost, LabSpec
+
+# Idle-lab reaper (Docker runtime). A background thread samples every running
+# lab container; a lab counts as active in an interval if students made
+# requests through the hub's proxy, or the container moved network traffic or
+# used CPU above small thresholds (the image's own healthcheck stays below them).
+# Labs idle past WWC_IDLE_MINUTES are stopped, or paused and transparently
+# resumed by the proxy on the next request.
+
+IDLE_MINUTES = float(os.environ.get("WWC_IDLE_MINUTES", "45"))
+IDLE_ACTION = os.environ.get("WWC_IDLE_ACTION", "stop")  # "stop" or "pause"
+CHECK_SECONDS = float(os.environ.get("WWC_IDLE_CHECK_SECONDS", "30"))
+CPU_PERCENT = float(os.environ.get("WWC_IDLE_CPU_PERCENT", "2.0"))
+NET_BYTES = int(os.environ.get("WWC_IDLE_NET_BYTES", "4096"))
+
+HISTORY_SAMPLES = 120  # per lab; one hour at the default 30 s interval
+MAX_EVENTS = 50
+
+
+@dataclass
+class Sample:
+    at: float
+    requests: int
+    net_bytes: int
+    cpu_percent: Optional[float]
+    active: bool
+    paused: bool = False
+
+
+@dataclass
+class LabActivity:
+    started_at: float
+    last_active_at: float
+    last_reason: str = "started"
+    # Container the record belongs to; a restarted lab gets a fresh record
+    container_id: str = ""
+    # Previous raw counters, to turn Docker's cumulative stats into per-interval deltas
+    prev_requests: int = 0
+    prev_net: Optional[int] = None
+    prev_cpu: Optional[tuple[int, int]] = None
+    history: deque = field(default_factory=lambda: deque(maxlen=HISTORY_SAMPLES))
+
+
+_lock = threading.Lock()
+_events_cv = threading.Condition(_lock)
+_activity: dict[str, LabActivity] = {}
+_paused: set[str] = set()
+_events: deque = deque(maxlen=MAX_EVENTS)
+_event_seq = 0
+_thread: Optional[threading.Thread] = None
+
+
+def enabled() -> bool:
+    return IDLE_MINUTES > 0
+
+
+def _emit(kind: str, lab: LabSpec, message: str) -> None:
+    global _event_seq
+    with _events_cv:
+        _event_seq += 1
+        _events.append({"seq": _event_seq, "at": time.time(), "type": kind, "lab_id": lab.id, "message": message})
+        _events_cv.notify_all()
+
+
+def recent_events(max_age: float = 3600.0) -> list[dict]:
+    cutoff = time.time() - max_age
+    with _lock:
+        return [e for e in reversed(_events) if e["at"] >= cutoff]
+
+
+def follow_events(after: int = 0, keepalive: float = 25.0) -> Iterator[Optional[dict]]:
+    """
+    Yields reaper events with seq > after as they happen. Yields None every
+    `keepalive` seconds without events so the SSE connection stays open.
+    """
+    with _lock:
+        if not after:
+            after = _event_seq
+    while True:
+        with _events_cv:
+            if _event_seq <= after:
+                _events_cv.wait(keepalive)
+            new = [e for e in _events if e["seq"] > after]
+        if not new:
+            yield None
+            continue
+        for e in new:
+            after = e["seq"]
+            yield e
+
+
+def _parse_docker_time(value: str) -> Optional[float]:
+    # "2025-01-10T14:03:07.123456789Z" -> epoch seconds (fractional digits dropped)
+    try:
+        return float(calendar.timegm(time.strptime(value[:19], "%Y-%m-%dT%H:%M:%S")))
+    except (TypeError, ValueError):
+        return None
+
+
+def _cpu_counters(stats: dict) -> Optional[tuple[int, int, int]]:
+    cpu = stats.get("cpu_stats") or {}
+    total = (cpu.get("cpu_usage") or {}).get("total_usage")
+    system = cpu.get("system_cpu_usage")
+    if total is None or system is None:
+        return None
+    cpus = cpu.get("online_cpus") or len((cpu.get("cpu_usage") or {}).get("percpu_usage") or []) or 1
+    return int(total), int(system), int(cpus)
+
+
+def _net_bytes(stats: dict) -> int:
+    return sum(int(n.get("rx_bytes", 0)) + int(n.get("tx_bytes", 0)) for n in (stats.get("networks") or {}).values())
+
+
+def _sample_lab(lab: LabSpec, host: DockerHost, now: float) -> None:
+    c = docker_control.docker_client(host).containers.get(lab.container_name)
+    paused = c.status == "paused"
+    requests = proxy.request_count(lab.id)
+    if paused:
+        # Also covers labs paused before a hub restart, so the proxy still resumes them
+        with _lock:
+            _paused.add(lab.id)
+
+    with _lock:
+        act = _activity.get(lab.id)
+    if act is None or act.container_id != c.id:
+        # First sighting (new lab, the hub restarted, or the lab was restarted
+        # since the last check): the idle clock and counters start over now
+        started = _parse_docker_time(((c.attrs or {}).get("State") or {}).get("StartedAt", "")) or now
+        act = LabActivity(started_at=started, last_active_at=now, prev_requests=requests, container_id=c.id)
+        with _lock:
+            _activity[lab.id] = act
+
+    net = cpu_pct = None
+    if not paused:
+        stats = c.stats(stream=False, one_shot=True)
+        net = _net_bytes(stats)
+        counters = _cpu_counters(stats)
+        if counters is not None:
+            total, system, cpus = counters
+            if act.prev_cpu is not None and system > act.prev_cpu[1]:
+                cpu_pct = (total - act.prev_cpu[0]) / (system - act.prev_cpu[1]) * cpus * 100.0
+            act.prev_cpu = (total, system)
+
+    new_requests = max(0, requests - act.prev_requests)
+    net_delta = max(0, net - act.prev_net) if net is not None and act.prev_net is not None else 0
+    act.prev_requests = requests
+    if net is not None:
+        act.prev_net = net
+
+    reason = None
+    if new_requests:
+        reason = f"{new_requests} requests"
+    elif net_delta >= NET_BYTES:
+        reason = f"{net_delta} B network"
+    elif cpu_pct is not None and cpu_pct >= CPU_PERCENT:
+        reason = f"{cpu_pct:.1f}% CPU"
+
+    if reason:
+        act.last_active_at = now
+        act.last_reason = reason
+
+    act.history.append(
+        Sample(
+            at=now,
+            requests=new_requests,
+            net_bytes=net_delta,
+            cpu_percent=round(cpu_pct, 2) if cpu_pct is not None else None,
+            active=reason is not None,
+            paused=paused,
+        )
+    )
+
+    idle = now - max(act.last_active_at, proxy.last_request_at(lab.id) or 0.0)
+    if paused or idle < IDLE_MINUTES * 60:
+        return
+
+    minutes = int(idle // 60)
+    where = "" if len(docker_control.HOSTS) == 1 else f" on {host.name}"
+    if IDLE_ACTION == "pause":
+        c.pause()
+        with _lock:
+            _paused.add(lab.id)
+        _emit("paused", lab, f"Paused {lab.title}{where} after {minutes} min idle. It resumes on the next visit.")
+    else:
+        docker_control.stop_lab(lab)
+        with _lock:
+            _activity.pop(lab.id, None)
+        _emit("stopped", lab, f"Stopped {lab.title}{where} after {minutes} min idle.")
+
+
+def check_once() -> None:
+    now = time.time()
+    running = docker_control.running_labs(docker_control.load_labs())
+    running_ids = {lab.id for lab, _ in running}
+
+    for lab, host in running:
+        try:
+            _sample_lab(lab, host, now)
+        except NotFound:
+            continue
+        except (DockerException, RequestException) as e:
+            _emit("warning", lab, f"Could not sample {lab.title}: {e}")
+
+    # Forget labs that were stopped or switched by hand
+    with _lock:
+        for lab_id in list(_activity):
+            if lab_id not in running_ids:
+                _activity.pop(lab_id, None)
+                _paused.discard(lab_id)
+
+
+def resume_if_paused(lab: LabSpec) -> None:
+    """
+    Called by the proxy before forwarding; unpauses a lab the reaper paused.
+    A set lookup when nothing is paused.
+    """
+    if lab.id not in _paused:
+        return
+    with _lock:
+        if lab.id not in _paused:
+            return
+        _paused.discard(lab.id)
+
+    placement = docker_control.get_placement(lab.id)
+    try:
+        c = docker_control.docker_client(placement.host if placement else None).containers.get(lab.container_name)
+        if c.status == "paused":
+            c.unpause()
+            with _lock:
+                act = _activity.get(lab.id)
+                if act is not None:
+                    act.last_active_at = time.time()
+                    act.last_reason = "resumed"
+            _emit("resumed", lab, f"Resumed {lab.title} for a new visit.")
+    except (DockerException, RequestException):
+        pass
+
+
+def _loop() -> None:
+    while True:
+        try:
+            check_once()
+        except (DockerException, RequestException, OSError):
+            # Docker briefly unavailable; try again next interval
+            pass
+        time.sleep(CHECK_SECONDS)
+
+
+def start_reaper() -> None:
+    global _thread
+    if not enabled() or (_thread is not None and _thread.is_alive()):
+        return
+    _thread = threading.Thread(target=_loop, name="idle-lab-reaper", daemon=True)
+    _thread.start()
+
+
+def snapshot() -> dict:
+    now = time.time()
+    with _lock:
+        labs = {
+            lab_id: {
+                "started_at": a.started_at,
+                "last_active_at": a.last_active_at,
+                "last_reason": a.last_reason,
+                "idle_seconds": round(now - a.last_active_at, 1),
+                "paused": lab_id in _paused,
+                "history": [asdict(s) for s in a.history],
+            }
+            for lab_id, a in _activity.items()
+        }
+        events = list(reversed(_events))
+
+    return {
+        "enabled": enabled(),
+        "idle_minutes": IDLE_MINUTES,
+        "action": IDLE_ACTION,
+        "check_seconds": CHECK_SECONDS,
+        "cpu_percent_threshold": CPU_PERCENT,
+        "net_bytes_threshold": NET_BYTES,
+        "labs": labs,
+        "events": events,
+    }
@@ -2,11 +2,13 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from typing import Iterator
+from typing import Iterator, Optional
 
-from flask import Blueprint, Response, abort, flash, redirect, render_template, request, url_for
+from flask import Blueprint, Response, abort, current_app, flash, jsonify, redirect, render_template, request, url_for
 
-from .docker_control import get_running_lab_id, load_labs, start_lab_steps, stop_all_labs_steps
+from server_timing import phase
+
+from . import docker_control, inprocess, lab_logs, proxy, reaper, telemetry
 
 bp = Blueprint("hub", __name__)
 
@@ -24,6 +26,18 @@ def load_assessment(name: str) -> dict:
         return json.load(f)
 
 
+def _runtime():
+    """Lab runtime selected in create_app(): Docker containers or in-process mounts."""
+    return inprocess if current_app.config.get("LAB_RUNTIME") == "inprocess" else docker_control
+
+
+def _idle_events() -> Optional[list[dict]]:
+    """Recent idle-reaper notices for the page banner; None when the reaper is off."""
+    if _runtime() is not docker_control or not reaper.enabled():
+        return None
+    return reaper.recent_events()
+
+
 def _sse(events: Iterator[dict]) -> Response:
     def gen():
         for ev in events:
@@ -36,28 +50,143 @@ def _sse(events: Iterator[dict]) -> Response:
 
 @bp.get("/")
 def index():
-    labs = load_labs()
-    running_lab_id = get_running_lab_id()
-    return render_template("index.html", labs=labs, running_lab_id=running_lab_id)
+    runtime = _runtime()
+    with phase("labs"):
+        labs = runtime.load_labs()
+    with phase("docker"):
+        running_lab_id = runtime.get_running_lab_id()
+    return render_template(
+        "index.html",
+        labs=labs,
+        running_lab_id=running_lab_id,
+        idle_events=_idle_events(),
+    )
 
 
 @bp.get("/labs")
 def labs_page():
-    labs = load_labs()
-    running_lab_id = get_running_lab_id()
-    return render_template("labs.html", labs=labs, running_lab_id=running_lab_id)
+    runtime = _runtime()
+    with phase("labs"):
+        labs = runtime.load_labs()
+    with phase("docker"):
+        running_lab_id = runtime.get_running_lab_id()
+        hosts = runtime.host_statuses()
+    return render_template(
+        "labs.html",
+        labs=labs,
+        running_lab_id=running_lab_id,
+        running_lab_host=runtime.get_lab_host(running_lab_id),
+        hosts=hosts,
+        lab_runtime=current_app.config.get("LAB_RUNTIME"),
+        idle_events=_idle_events(),
+    )
+
+
+@bp.get("/telemetry")
+def telemetry_page():
+    with phase("labs"):
+        labs = _runtime().load_labs()
+    return render_template(
+        "telemetry.html",
+        labs=labs,
+        resolutions=list(telemetry.RESOLUTIONS),
+        lab_runtime=current_app.config.get("LAB_RUNTIME"),
+    )
 
 
 # --- Modal-progress API endpoints (SSE) ---
 
 @bp.get("/api/labs/start/<lab_id>")
 def api_labs_start(lab_id: str):
-    return _sse(start_lab_steps(lab_id))
+    return _sse(_runtime().start_lab_steps(lab_id))
 
 
 @bp.get("/api/labs/stop-all")
 def api_labs_stop_all():
-    return _sse(stop_all_labs_steps())
+    return _sse(_runtime().stop_all_labs_steps())
+
+
+@bp.get("/api/labs/<lab_id>/logs")
+def api_lab_logs(lab_id: str):
+    """
+    Container output of one lab: ?follow=0 returns the last ?tail=N lines as
+    JSON; otherwise the same lines, then new ones, are streamed as SSE.
+    """
+    if _runtime() is not docker_control:
+        return jsonify({"error": "In-process labs log to the hub's own output."}), 404
+    lab = proxy.find_lab(lab_id)
+    if not lab:
+        abort(404)
+
+    buf = lab_logs.ensure_following(lab)
+    tail = request.args.get("tail", 100, type=int)
+    if request.args.get("follow") == "0":
+        return jsonify({"lab_id": lab_id, "lines": buf.tail(tail)})
+
+    def events():
+        for ev in lab_logs.stream(lab_id, tail):
+            yield ev if ev is not None else {"type": "keepalive"}
+
+    return _sse(events())
+
+
+# --- Lab reverse proxy (Docker runtime; in-process labs are mounted at the same paths) ---
+
+PROXY_METHODS = ["GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"]
+
+
+@bp.route("/lab/<lab_id>/", defaults={"path": ""}, methods=PROXY_METHODS)
+@bp.route("/lab/<lab_id>/<path:path>", methods=PROXY_METHODS)
+def lab_proxy(lab_id: str, path: str):
+    lab = proxy.find_lab(lab_id)
+    if not lab:
+        abort(404)
+    return proxy.proxy_request(lab, path, request)
+
+
+@bp.get("/api/reaper")
+def api_reaper():
+    return jsonify(reaper.snapshot())
+
+
+@bp.get("/api/reaper/events")
+def api_reaper_events():
+    def events():
+        for ev in reaper.follow_events(request.args.get("after", 0, type=int)):
+            # Periodic no-op event keeps idle connections from being dropped
+            yield ev if ev is not None else {"type": "keepalive"}
+
+    return _sse(events())
+
+
+@bp.get("/api/hosts")
+def api_hosts():
+    return jsonify({"hosts": _runtime().host_statuses()})
+
+
+@bp.get("/api/telemetry")
+def api_telemetry():
+    return jsonify(telemetry.snapshot())
+
+
+@bp.get("/api/telemetry/<lab_id>")
+def api_telemetry_lab(lab_id: str):
+    try:
+        data = telemetry.lab_series(
+            lab_id,
+            request.args.get("resolution", "1s"),
+            request.args.get("last", type=int),
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if data is None:
+        return jsonify({"error": f"No telemetry for {lab_id} yet (is it running?)"}), 404
+    return jsonify(data)
+
+
+@bp.get("/api/proxy/stats")
+def api_proxy_stats():
+    return jsonify(proxy.stats_snapshot())
 
 
 # --- Keep these simple routes for non-JS fallback (optional) ---
@@ -67,7 +196,7 @@ def labs_stop_fallback():
     # Non-modal fallback: best-effort stop, then return to index
     try:
         # consume generator to execute
-        for _ in stop_all_labs_steps():
+        for _ in _runtime().stop_all_labs_steps():
             pass
         flash("Stopped all labs.", "success")
     except Exception as e:
@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import math
+import os
+import threading
+import time
+from array import array
+from dataclasses import dataclass, field
+from typing import Optional
+
+from docker.errors import DockerException, NotFound
+from requests.exceptions import RequestException
+
+from . import docker_control
+from .docker_control import DockerHost, LabSpec
+
+# Container telemetry (Docker runtime). One thread per running lab follows
+# Docker's streaming stats (about one sample per second) and folds each sample
+# into fixed-size ring buffers at three resolutions. Everything is preallocated
+# per lab, so memory stays flat however long the hub runs:
+#
+#   1s  x 300  (last 5 minutes)
+#   10s x 360  (last hour)
+#   1m  x 1440 (last day)
+#
+# CPU and network rates are averaged into the coarser buckets; memory keeps the
+# bucket maximum, since peaks are what matter when sizing a classroom host.
+
+SCAN_SECONDS = float(os.environ.get("WWC_TELEMETRY_SCAN_SECONDS", "5"))
+
+RESOLUTIONS = {"1s": (1, 300), "10s": (10, 360), "1m": (60, 1440)}
+METRICS = ("cpu_percent", "mem_bytes", "net_rx_bps", "net_tx_bps")
+MAX_METRICS = {"mem_bytes"}
+
+
+class Ring:
+    """Fixed-capacity ring of floats backed by array('d')."""
+
+    def __init__(self, capacity: int):
+        self.data = array("d", [math.nan]) * capacity
+        self.capacity = capacity
+        self.pos = 0
+        self.count = 0
+
+    def append(self, value: float) -> None:
+        self.data[self.pos] = value
+        self.pos = (self.pos + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def values(self, last: Optional[int] = None) -> list[float]:
+        """Oldest to newest, optionally only the `last` values."""
+        n = self.count if last is None else min(last, self.count)
+        start = (self.pos - n) % self.capacity
+        if start + n <= self.capacity:
+            return self.data[start : start + n].tolist()
+        return (self.data[start:] + self.data[: (start + n) % self.capacity]).tolist()
+
+
+class Series:
+    """One resolution: bucket start times plus one Ring per metric."""
+
+    def __init__(self, step: int, capacity: int):
+        self.step = step
+        self.times = Ring(capacity)
+        self.rings = {m: Ring(capacity) for m in METRICS}
+        # Bucket being filled
+        self.bucket: Optional[float] = None
+        self.n = 0
+        self.acc = dict.fromkeys(METRICS, 0.0)
+
+    def add(self, at: float, values: dict[str, float]) -> None:
+        bucket = at - (at % self.step)
+        if self.bucket is not None and bucket != self.bucket:
+            self._flush()
+        self.bucket = bucket
+        self.n += 1
+        for m in METRICS:
+            if m in MAX_METRICS:
+                self.acc[m] = max(self.acc[m], values[m])
+            else:
+                self.acc[m] += values[m]
+
+    def _flush(self) -> None:
+        if not self.n:
+            return
+        self.times.append(self.bucket)
+        for m in METRICS:
+            value = self.acc[m] if m in MAX_METRICS else self.acc[m] / self.n
+            self.rings[m].append(value)
+        self.n = 0
+        self.acc = dict.fromkeys(METRICS, 0.0)
+
+    def snapshot(self, last: Optional[int] = None) -> dict:
+        return {
+            "step_seconds": self.step,
+            "t": self.times.values(last),
+            **{m: [round(v, 2) for v in self.rings[m].values(last)] for m in METRICS},
+        }
+
+
+def _new_series() -> dict[str, Series]:
+    return {name: Series(step, capacity) for name, (step, capacity) in RESOLUTIONS.items()}
+
+
+@dataclass
+class LabTelemetry:
+    lab_id: str
+    host: str = ""
+    running: bool = False
+    followed_since: Optional[float] = None
+    last_sample_at: Optional[float] = None
+    latest: dict = field(default_factory=dict)
+    mem_limit: int = 0
+    # Kept across lab restarts so sizing data survives a class period
+    peak_mem_bytes: float = 0.0
+    peak_mem_at: Optional[float] = None
+    peak_cpu_percent: float = 0.0
+    samples: int = 0
+    series: dict = field(default_factory=_new_series)
+    # Previous cumulative network counters, for per-second rates
+    prev_net: Optional[tuple[float, int, int]] = None
+
+
+_lock = threading.Lock()
+_labs: dict[str, LabTelemetry] = {}
+_followers: dict[str, threading.Thread] = {}
+_thread: Optional[threading.Thread] = None
+
+
+def _lab_telemetry(lab_id: str) -> LabTelemetry:
+    with _lock:
+        tel = _labs.get(lab_id)
+        if tel is None:
+            tel = _labs[lab_id] = LabTelemetry(lab_id=lab_id)
+        return tel
+
+
+def _cpu_percent(stats: dict) -> float:
+    cpu = stats.get("cpu_stats") or {}
+    pre = stats.get("precpu_stats") or {}
+    cpu_delta = (cpu.get("cpu_usage") or {}).get("total_usage", 0) - (pre.get("cpu_usage") or {}).get("total_usage", 0)
+    system_delta = cpu.get("system_cpu_usage", 0) - pre.get("system_cpu_usage", 0)
+    if system_delta <= 0 or cpu_delta < 0:
+        return 0.0
+    cpus = cpu.get("online_cpus") or len((cpu.get("cpu_usage") or {}).get("percpu_usage") or []) or 1
+    return cpu_delta / system_delta * cpus * 100.0
+
+
+def _mem_bytes(stats: dict) -> tuple[float, int]:
+    # Same as `docker stats`: usage minus reclaimable page cache (cgroup v2, then v1 names)
+    mem = stats.get("memory_stats") or {}
+    detail = mem.get("stats") or {}
+    cache = detail.get("inactive_file", detail.get("total_inactive_file", detail.get("cache", 0)))
+    return float(max(0, mem.get("usage", 0) - cache)), int(mem.get("limit", 0))
+
+
+def _net_counters(stats: dict) -> tuple[int, int]:
+    networks = (stats.get("networks") or {}).values()
+    return sum(int(n.get("rx_bytes", 0)) for n in networks), sum(int(n.get("tx_bytes", 0)) for n in networks)
+
+
+def record(tel: LabTelemetry, stats: dict, now: float) -> None:
+    """Folds one Docker stats sample into a lab's ring buffers."""
+    cpu = _cpu_percent(stats)
+    mem, limit = _mem_bytes(stats)
+    rx, tx = _net_counters(stats)
+
+    rx_bps = tx_bps = 0.0
+    if tel.prev_net is not None:
+        prev_at, prev_rx, prev_tx = tel.prev_net
+        elapsed = now - prev_at
+        if elapsed > 0:
+            rx_bps = max(0, rx - prev_rx) / elapsed
+            tx_bps = max(0, tx - prev_tx) / elapsed
+    tel.prev_net = (now, rx, tx)
+
+    values = {"cpu_percent": cpu, "mem_bytes": mem, "net_rx_bps": rx_bps, "net_tx_bps": tx_bps}
+    with _lock:
+        for series in tel.series.values():
+            series.add(now, values)
+        tel.latest = {k: round(v, 2) for k, v in values.items()}
+        tel.last_sample_at = now
+        tel.mem_limit = limit
+        tel.samples += 1
+        tel.peak_cpu_percent = max(tel.peak_cpu_percent, cpu)
+        if mem > tel.peak_mem_bytes:
+            tel.peak_mem_bytes = mem
+            tel.peak_mem_at = now
+
+
+def _follow(lab: LabSpec, host: DockerHost) -> None:
+    tel = _lab_telemetry(lab.id)
+    with _lock:
+        tel.host = host.name
+        tel.running = True
+        tel.followed_since = time.time()
+        tel.prev_net = None
+    try:
+        c = docker_control.docker_client(host).containers.get(lab.container_name)
+        for stats in c.stats(stream=True, decode=True):
+            # A stopped container reports a zero timestamp and no counters
+            if str(stats.get("read", "")).startswith("0001-"):
+                break
+            record(tel, stats, time.time())
+    except (NotFound, DockerException, RequestException, OSError):
+        pass
+    finally:
+        with _lock:
+            tel.running = False
+            _followers.pop(lab.id, None)
+
+
+def scan_once() -> None:
+    """Starts a stats follower for every running lab that doesn't have one."""
+    for lab, host in docker_control.running_labs(docker_control.load_labs()):
+        with _lock:
+            follower = _followers.get(lab.id)
+            if follower is not None and follower.is_alive():
+                continue
+            follower = threading.Thread(target=_follow, args=(lab, host), name=f"telemetry-{lab.id}", daemon=True)
+            _followers[lab.id] = follower
+        follower.start()
+
+
+def _loop() -> None:
+    while True:
+        try:
+            scan_once()
+        except (DockerException, RequestException, OSError):
+            # Docker briefly unavailable; try again next interval
+            pass
+        time.sleep(SCAN_SECONDS)
+
+
+def start_telemetry() -> None:
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return
+    _thread = threading.Thread(target=_loop, name="lab-telemetry", daemon=True)
+    _thread.start()
+
+
+def _summary(tel: LabTelemetry) -> dict:
+    return {
+        "lab_id": tel.lab_id,
+        "host": tel.host,
+        "running": tel.running,
+        "followed_since": tel.followed_since,
+        "last_sample_at": tel.last_sample_at,
+        "samples": tel.samples,
+        "latest": tel.latest,
+        "mem_limit_bytes": tel.mem_limit,
+        "peak_mem_bytes": tel.peak_mem_bytes,
+        "peak_mem_at": tel.peak_mem_at,
+        "peak_cpu_percent": round(tel.peak_cpu_percent, 2),
+    }
+
+
+def snapshot() -> dict:
+    with _lock:
+        labs = [_summary(t) for t in _labs.values()]
+    return {
+        "resolutions": {name: {"step_seconds": s, "points": n} for name, (s, n) in RESOLUTIONS.items()},
+        "labs": labs,
+        # Memory needed to keep every lab seen so far warm at once
+        "sum_peak_mem_bytes": sum(lab["peak_mem_bytes"] for lab in labs),
+        "running_mem_bytes": sum(lab["latest"].get("mem_bytes", 0) for lab in labs if lab["running"]),
+    }
+
+
+def lab_series(lab_id: str, resolution: str = "1s", last: Optional[int] = None) -> Optional[dict]:
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f"resolution must be one of: {', '.join(RESOLUTIONS)}")
+    with _lock:
+        tel = _labs.get(lab_id)
+        if tel is None:
+            return None
+        return {**_summary(tel), "resolution": resolution, "series": tel.series[resolution].snapshot(last)}
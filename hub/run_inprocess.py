@@ -0,0 +1,28 @@
+"""
+Runs the Lab Hub and all five labs in a single Python process, without Docker.
+
+Each lab's Flask app is imported from labs/*/app/app.py and served by the hub
+under /lab/<id>/, using the lab's data/ directory from this checkout.
+
+    pip install -r hub/requirements.txt
+    python hub/run_inprocess.py
+
+Then open http://localhost:8080
+"""
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+os.environ.setdefault("WWC_LAB_RUNTIME", "inprocess")
+os.environ.setdefault("WWC_LABS_JSON", str(ROOT / "labs" / "labs.json"))
+sys.path.insert(0, str(ROOT / "hub"))
+# shared/server_timing.py (the Docker images copy it next to each app)
+sys.path.insert(0, str(ROOT / "shared"))
+
+from app import create_app  # noqa: E402
+
+if __name__ == "__main__":
+    app = create_app()
+    app.run(host="127.0.0.1", port=int(os.environ.get("PORT", "8080")), threaded=True)
@@ -1,13 +1,18 @@
 from __future__ import annotations
 
 import json
+import os
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional
 
 from flask import Flask, render_template, request
+from werkzeug.middleware.proxy_fix import ProxyFix
 
-# Primary expected location (baked into the image)
-DATA_PATH = Path("/app/data/scenarios.json")
+from server_timing import ServerTiming, phase
+
+# Primary expected location (baked into the image). Override with the
+# LAB_DATA_DIR environment variable or create_app(data_dir=...).
+DATA_DIR = Path(os.environ.get("LAB_DATA_DIR", "/app/data"))
 
 
 def load_scenarios() -> list[dict[str, Any]]:
@@ -17,14 +22,15 @@ def load_scenarios() -> list[dict[str, Any]]:
     Expected file path inside container:
       /app/data/scenarios.json
     """
-    if not DATA_PATH.exists():
+    path = DATA_DIR / "scenarios.json"
+    if not path.exists():
         raise FileNotFoundError(
-            f"Missing scenarios file at {DATA_PATH}. "
+            f"Missing scenarios file at {path}. "
             f"Ensure labs/lab1-cia-matcher/data/scenarios.json exists in the repo and "
             f"the lab image was rebuilt."
         )
 
-    with open(DATA_PATH, "r", encoding="utf-8") as f:
+    with open(path, "r", encoding="utf-8") as f:
         raw = json.load(f)
 
     scenarios = raw.get("scenarios", [])
@@ -32,12 +38,21 @@ def load_scenarios() -> list[dict[str, Any]]:
     return scenarios
 
 
-def create_app() -> Flask:
+def create_app(data_dir: Optional[Path] = None) -> Flask:
+    global DATA_DIR
+    if data_dir is not None:
+        DATA_DIR = Path(data_dir)
+
     app = Flask(__name__)
 
+    # Served behind the hub's /lab/<id>/ reverse proxy.
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1, x_prefix=1)
+    ServerTiming(app, label="lab1")
+
     @app.get("/")
     def match():
-        scenarios = load_scenarios()
+        with phase("data"):
+            scenarios = load_scenarios()
         return render_template(
             "match.html",
             title="Lab 1 — CIA Triad Scenario Matcher",
@@ -49,30 +64,32 @@ def create_app() -> Flask:
 
     @app.post("/submit")
     def submit():
-        scenarios = load_scenarios()
-        submitted = dict(request.form)
+        with phase("data"):
+            scenarios = load_scenarios()
+            submitted = dict(request.form)
 
         score = 0
         results: list[dict[str, Any]] = []
 
-        for s in scenarios:
-            sid = s.get("id")
-            correct = s.get("primary")
-            picked = submitted.get(sid, "")
-            ok = picked == correct
-            score += 1 if ok else 0
-
-            results.append(
-                {
-                    "id": sid,
-                    "prompt": s.get("prompt", ""),
-                    "picked": picked,
-                    "correct": correct,
-                    "ok": ok,
-                    "explanation": s.get("explanation", ""),
-                    "secondary": s.get("secondary", []),
-                }
-            )
+        with phase("score"):
+            for s in scenarios:
+                sid = s.get("id")
+                correct = s.get("primary")
+                picked = submitted.get(sid, "")
+                ok = picked == correct
+                score += 1 if ok else 0
+
+                results.append(
+                    {
+                        "id": sid,
+                        "prompt": s.get("prompt", ""),
+                        "picked": picked,
+                        "correct": correct,
+                        "ok": ok,
+                        "explanation": s.get("explanation", ""),
+                        "secondary": s.get("secondary", []),
+                    }
+                )
 
         return render_template(
             "match.html",
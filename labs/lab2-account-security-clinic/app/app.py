@@ -1,11 +1,35 @@
 from __future__ import annotations
 
+import csv
+import io
+import json
+import math
+import os
 import secrets
 import string
+import time
 from dataclasses import dataclass
-from typing import List
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterator, List, Optional
 
-from flask import Flask, redirect, render_template, request, url_for
+from flask import Flask, Response, jsonify, redirect, render_template, request, url_for
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+import strength
+from server_timing import ServerTiming, phase
+from strength import estimate_strength, load_frequency_lists, strength_report
+
+# Primary expected location (baked into the image). Override with the
+# LAB_DATA_DIR environment variable or create_app(data_dir=...).
+DATA_DIR = Path(os.environ.get("LAB_DATA_DIR", "/app/data"))
+
+SYMBOLS = "!@#$%"
+
+# Bulk handout limits. Items are generated and streamed in batches so one
+# randomness draw covers many results without holding the whole sheet in memory.
+BULK_MAX_COUNT = 10_000
+BULK_BATCH = 256
 
 
 @dataclass(frozen=True)
@@ -44,9 +68,23 @@ MODULES: List[Module] = [
 ]
 
 
-def create_app() -> Flask:
+def create_app(data_dir: Optional[Path] = None) -> Flask:
+    global DATA_DIR
+    if data_dir is not None:
+        DATA_DIR = Path(data_dir)
+        load_wordlist.cache_clear()
+        strength.FREQUENCY_DIR = DATA_DIR / "frequency"
+        strength.load_frequency_lists.cache_clear()
+
     app = Flask(__name__)
 
+    # Served behind the hub's /lab/<id>/ reverse proxy.
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1, x_prefix=1)
+    ServerTiming(app, label="lab2")
+
+    # Load the frequency lists now rather than on the first student's strength check
+    load_frequency_lists()
+
     @app.get("/")
     def index():
         return render_template(
@@ -62,7 +100,12 @@ def create_app() -> Flask:
             return redirect(url_for("index"))
 
         if key == "passwords":
-            return render_template("module_passwords.html", title=mod.title, module=mod)
+            return render_template(
+                "module_passwords.html",
+                title=mod.title,
+                module=mod,
+                entropy_bits=passphrase_entropy_bits(4),
+            )
 
         if key == "mfa":
             return render_template("module_mfa.html", title=mod.title, module=mod)
@@ -93,13 +136,15 @@ def create_app() -> Flask:
         include_digit = request.form.get("include_digit") == "on"
         include_symbol = request.form.get("include_symbol") == "on"
 
-        passphrase = generate_passphrase(words=words, separator=separator)
-
-        if include_digit:
-            passphrase += str(secrets.randbelow(10))
-        if include_symbol:
-            passphrase += secrets.choice("!@#$%")
-
+        passphrase = next(
+            iter_passphrases(
+                1,
+                words=words,
+                separator=separator,
+                include_digit=include_digit,
+                include_symbol=include_symbol,
+            )
+        )
         passphrase = _fit_to_length(passphrase, length)
 
         return render_template(
@@ -113,9 +158,118 @@ def create_app() -> Flask:
             include_symbol=include_symbol,
         )
 
+    @app.post("/passwords/strength")
+    def passwords_strength():
+        payload = request.get_json(silent=True)
+        if payload is None:
+            password = request.form.get("password", "")
+        elif isinstance(payload, dict) and isinstance(payload.get("password", ""), str):
+            password = payload.get("password", "")
+        else:
+            return jsonify({"error": 'Send {"password": "<string>"} as JSON, or a password form field.'}), 400
+
+        t0 = time.perf_counter()
+        with phase("estimate"):
+            report = strength_report(password)
+        report["elapsed_us"] = round((time.perf_counter() - t0) * 1e6)
+
+        resp = jsonify(report)
+        resp.headers["Cache-Control"] = "no-store"
+        return resp
+
+    @app.get("/passwords/strength/benchmark")
+    def passwords_strength_benchmark():
+        count = _clamp_int(request.args.get("count", "300"), 1, 5000)
+        return jsonify(benchmark_strength(count))
+
+    @app.get("/bulk/passphrases")
+    def bulk_passphrases():
+        count = _clamp_int(request.args.get("count", "30"), 1, BULK_MAX_COUNT)
+        words = _clamp_int(request.args.get("words", "4"), 3, 7)
+        separator = request.args.get("separator", "-")[:1]
+        include_digit = request.args.get("include_digit") == "on"
+        include_symbol = request.args.get("include_symbol") == "on"
+        fmt = _bulk_format(request.args.get("format", "csv"))
+
+        bits = round(passphrase_entropy_bits(words, include_digit, include_symbol), 1)
+        rows = (
+            {"n": i, "passphrase": p, "entropy_bits": bits}
+            for i, p in enumerate(
+                iter_passphrases(count, words, separator, include_digit, include_symbol),
+                start=1,
+            )
+        )
+        meta = {"kind": "passphrases", "count": count, "words": words, "wordlist_size": len(load_wordlist())}
+        return _bulk_response(rows, ["n", "passphrase", "entropy_bits"], meta, fmt, "passphrases")
+
+    @app.get("/bulk/recovery-codes")
+    def bulk_recovery_codes():
+        count = _clamp_int(request.args.get("count", "30"), 1, BULK_MAX_COUNT)
+        per_set = _clamp_int(request.args.get("codes", "10"), 1, 20)
+        fmt = _bulk_format(request.args.get("format", "csv"))
+
+        bits = round(per_set * RECOVERY_CODE_BITS, 1)
+        code_fields = [f"code_{i}" for i in range(1, per_set + 1)]
+
+        def rows():
+            for i, codes in enumerate(iter_recovery_code_sets(count, per_set), start=1):
+                if fmt == "csv":
+                    yield {"set": i, **dict(zip(code_fields, codes)), "entropy_bits": bits}
+                else:
+                    yield {"set": i, "codes": codes, "entropy_bits": bits}
+
+        meta = {"kind": "recovery_codes", "count": count, "codes_per_set": per_set}
+        return _bulk_response(rows(), ["set", *code_fields, "entropy_bits"], meta, fmt, "recovery-codes")
+
+    @app.get("/bulk/benchmark")
+    def bulk_benchmark():
+        count = _clamp_int(request.args.get("count", "5000"), 1, BULK_MAX_COUNT)
+        return jsonify(benchmark_bulk(count))
+
     return app
 
 
+def _bulk_format(v: str) -> str:
+    return "json" if v.strip().lower() == "json" else "csv"
+
+
+def _bulk_response(rows: Iterator[dict], fields: List[str], meta: dict, fmt: str, name: str) -> Response:
+    """
+    Streams bulk results as CSV (one row per result) or as a JSON document
+    of the form {...meta, "results": [...]}, without buffering the whole sheet.
+    """
+    if fmt == "json":
+
+        def gen():
+            yield json.dumps(meta)[:-1] + ', "results": ['
+            for i, row in enumerate(rows):
+                yield ("," if i else "") + "\n" + json.dumps(row)
+            yield "\n]}\n"
+
+        mimetype = "application/json"
+    else:
+
+        def gen():
+            buf = io.StringIO()
+            writer = csv.DictWriter(buf, fieldnames=fields)
+            writer.writeheader()
+            for i, row in enumerate(rows, start=1):
+                writer.writerow(row)
+                if i % BULK_BATCH == 0:
+                    yield buf.getvalue()
+                    buf.seek(0)
+                    buf.truncate()
+            yield buf.getvalue()
+
+        mimetype = "text/csv"
+
+    return Response(
+        gen(),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'},
+    )
+
+
 def _clamp_int(v: str, lo: int, hi: int) -> int:
     try:
         n = int(v)
@@ -124,16 +278,86 @@ def _clamp_int(v: str, lo: int, hi: int) -> int:
     return max(lo, min(hi, n))
 
 
+@lru_cache(maxsize=1)
+def load_wordlist() -> tuple[str, ...]:
+    """
+    Loads the passphrase wordlist once per process.
+
+    Expected file path inside container:
+      /app/data/wordlist.txt  (EFF large wordlist, 7,776 words)
+    """
+    path = DATA_DIR / "wordlist.txt"
+    if not path.exists():
+        raise FileNotFoundError(
+            f"Missing wordlist file at {path}. "
+            f"Ensure labs/lab2-account-security-clinic/data/wordlist.txt exists in the repo and "
+            f"the lab image was rebuilt."
+        )
+
+    with open(path, "r", encoding="utf-8") as f:
+        words = (line.strip() for line in f)
+        return tuple(w for w in words if w and not w.startswith("#"))
+
+
+def random_indices(bound: int, count: int) -> List[int]:
+    """
+    Returns `count` uniform integers in [0, bound), drawn from the OS CSPRNG.
+
+    Randomness is fetched in one chunk per call and reinterpreted as fixed-width
+    unsigned integers; values at or above the largest multiple of `bound` are
+    rejected so the modulo does not bias the result.
+    """
+    width = 1
+    while 1 << (8 * width) < bound:
+        width *= 2
+    code = {1: "B", 2: "H", 4: "I", 8: "Q"}[width]
+    limit = ((1 << (8 * width)) // bound) * bound
+
+    out: List[int] = []
+    while len(out) < count:
+        need = count - len(out)
+        # Over-draw slightly so rejections rarely force a second round.
+        raw = secrets.token_bytes((need + need // 8 + 8) * width)
+        out.extend(v % bound for v in memoryview(raw).cast(code) if v < limit)
+    del out[count:]
+    return out
+
+
+def passphrase_entropy_bits(words: int, include_digit: bool = False, include_symbol: bool = False) -> float:
+    bits = words * math.log2(len(load_wordlist()))
+    if include_digit:
+        bits += math.log2(10)
+    if include_symbol:
+        bits += math.log2(len(SYMBOLS))
+    return bits
+
+
+def iter_passphrases(
+    count: int,
+    words: int,
+    separator: str,
+    include_digit: bool = False,
+    include_symbol: bool = False,
+) -> Iterator[str]:
+    wordlist = load_wordlist()
+    for start in range(0, count, BULK_BATCH):
+        n = min(BULK_BATCH, count - start)
+        picks = random_indices(len(wordlist), n * words)
+        digits = random_indices(10, n) if include_digit else None
+        symbols = random_indices(len(SYMBOLS), n) if include_symbol else None
+
+        for i in range(n):
+            chosen = picks[i * words:(i + 1) * words]
+            passphrase = separator.join(wordlist[j].capitalize() for j in chosen)
+            if digits:
+                passphrase += str(digits[i])
+            if symbols:
+                passphrase += SYMBOLS[symbols[i]]
+            yield passphrase
+
+
 def generate_passphrase(words: int, separator: str) -> str:
-    wordlist = [
-        "river", "planet", "canvas", "tomorrow", "orchard", "signal", "meadow", "harbor",
-        "pencil", "window", "kernel", "pepper", "laptop", "mosaic", "forest", "cobalt",
-        "paper", "castle", "violet", "ladder", "canyon", "honey", "thunder", "rocket",
-        "ember", "garden", "prairie", "circle", "glacier", "bicycle", "comet", "silver",
-    ]
-    chosen = [secrets.choice(wordlist) for _ in range(words)]
-    chosen = [w.capitalize() for w in chosen]
-    return separator.join(chosen)
+    return next(iter_passphrases(1, words=words, separator=separator))
 
 
 def _fit_to_length(s: str, target: int) -> str:
@@ -141,17 +365,124 @@ def _fit_to_length(s: str, target: int) -> str:
         return s
     if len(s) > target:
         return s[:target]
-    pad = "".join(secrets.choice(string.ascii_lowercase) for _ in range(target - len(s)))
+    letters = string.ascii_lowercase
+    pad = "".join(letters[i] for i in random_indices(len(letters), target - len(s)))
     return s + pad
 
 
+RECOVERY_CODE_BITS = math.log2(10**8)
+
+
+def iter_recovery_code_sets(count: int, per_set: int) -> Iterator[List[str]]:
+    sets_per_batch = max(1, BULK_BATCH // per_set)
+    for start in range(0, count, sets_per_batch):
+        n = min(sets_per_batch, count - start)
+        values = random_indices(10**8, n * per_set)
+        codes = [f"{v // 10**4:04d}-{v % 10**4:04d}" for v in values]
+        for i in range(n):
+            yield codes[i * per_set:(i + 1) * per_set]
+
+
 def generate_recovery_codes(n: int) -> List[str]:
-    codes = []
-    for _ in range(n):
-        part1 = secrets.randbelow(10**4)
-        part2 = secrets.randbelow(10**4)
-        codes.append(f"{part1:04d}-{part2:04d}")
-    return codes
+    return next(iter_recovery_code_sets(1, n))
+
+
+def benchmark_bulk(count: int) -> dict:
+    """
+    Times bulk generation of `count` 4-word passphrases and `count` sets of
+    10 recovery codes. Numbers are per process, so run it on the lab host.
+    """
+    load_wordlist()  # exclude the one-time file load from the timing
+
+    results = {}
+    for name, gen in (
+        ("passphrases", lambda: iter_passphrases(count, words=4, separator="-")),
+        ("recovery_code_sets", lambda: iter_recovery_code_sets(count, per_set=10)),
+    ):
+        t0 = time.perf_counter()
+        for _ in gen():
+            pass
+        elapsed = time.perf_counter() - t0
+        results[name] = {
+            "count": count,
+            "seconds": round(elapsed, 6),
+            "per_second": round(count / elapsed) if elapsed > 0 else None,
+        }
+
+    return {
+        "wordlist_size": len(load_wordlist()),
+        "passphrase_entropy_bits": round(passphrase_entropy_bits(4), 1),
+        "recovery_code_set_entropy_bits": round(10 * RECOVERY_CODE_BITS, 1),
+        "results": results,
+    }
+
+
+# Long repetitive inputs that used to be the estimator's slowest cases
+# (repeat, date and l33t enumeration); kept in the corpus so they stay cheap.
+WORST_CASE_SAMPLES = [
+    "0" * 64,
+    "1|" * 32,
+    "1234567890" * 6 + "1234",
+    "12/25/1999" * 6,
+    "aab" * 21,
+    "4@$$w0rd" * 8,
+]
+
+
+def _strength_samples(count: int) -> List[str]:
+    """
+    A mixed classroom-like corpus: common passwords with typical decorations,
+    generated passphrases, and random policy-style strings.
+    """
+    common = [w for w in load_frequency_lists().words[::97] if len(w) >= 6]
+    decorations = ["", "1", "123", "!", "2026", "@1"]
+    picks = random_indices(len(common), count)
+    decor = random_indices(len(decorations), count)
+    phrases = iter_passphrases(count, words=4, separator="-", include_digit=True)
+    alphabet = string.ascii_letters + string.digits + SYMBOLS
+    rand = random_indices(len(alphabet), count * 14)
+
+    samples = []
+    for i in range(count):
+        kind = i % 3
+        if kind == 0:
+            w = common[picks[i]]
+            samples.append((w.capitalize() if i % 2 else w) + decorations[decor[i]])
+        elif kind == 1:
+            samples.append(next(phrases))
+        else:
+            samples.append("".join(alphabet[k] for k in rand[i * 14:(i + 1) * 14]))
+    return samples
+
+
+def benchmark_strength(count: int) -> dict:
+    """
+    Times the strength estimator on `count` distinct passwords plus the
+    worst-case inputs. Every check pays the full matching cost; worst_case_us
+    is the slowest of the worst cases on their own.
+    """
+    load_frequency_lists()  # exclude the one-time file load from the timing
+    samples = _strength_samples(count) + WORST_CASE_SAMPLES
+
+    timings = []
+    for pw in samples:
+        t0 = time.perf_counter()
+        estimate_strength(pw)
+        timings.append(time.perf_counter() - t0)
+
+    ordered = sorted(timings)
+
+    def pct(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1e6)
+
+    total = sum(timings)
+    return {
+        "checks": len(samples),
+        "mean_length": round(sum(len(p) for p in samples) / len(samples), 1),
+        "latency_us": {"p50": pct(0.50), "p95": pct(0.95), "p99": pct(0.99), "max": round(ordered[-1] * 1e6)},
+        "worst_case_us": round(max(timings[count:]) * 1e6),
+        "checks_per_second": round(len(samples) / total) if total > 0 else None,
+    }
 
 
 if __name__ == "__main__":
@@ -0,0 +1,734 @@
+from __future__ import annotations
+
+import math
+import os
+import re
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass, replace
+from datetime import date
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Primary expected location (baked into the image). The lab's create_app()
+# repoints this when given another data directory.
+FREQUENCY_DIR = Path(os.environ.get("LAB_DATA_DIR", "/app/data")) / "frequency"
+
+# Ranked lists, checked in this order. Names are shown to students in feedback.
+DICTIONARIES = (
+    "passwords",
+    "english_wikipedia",
+    "female_names",
+    "male_names",
+    "surnames",
+    "us_tv_and_film",
+)
+
+# Longer input is scored on its first MAX_LENGTH characters only; the matchers
+# are quadratic-ish in length and live feedback must stay cheap.
+MAX_LENGTH = 64
+# A repeat's base is scored recursively up to this length; longer bases are
+# scored as bruteforce, so "x" * 64-style input can't fan out into sub-checks.
+MAX_REPEAT_BASE = 12
+# Date candidates considered per start position (windows of 4-10 characters)
+MAX_DATE_WINDOWS = 4
+
+REFERENCE_YEAR = date.today().year
+MIN_YEAR_SPACE = 20
+BRUTEFORCE_CARDINALITY = 10
+MIN_SUBMATCH_GUESSES_SINGLE_CHAR = 10
+MIN_SUBMATCH_GUESSES_MULTI_CHAR = 50
+MIN_GUESSES_BEFORE_GROWING_SEQUENCE = 10000
+
+# Relative tolerance when pruning against the best complete cover, so float
+# rounding never drops the cover that set the bound.
+BOUND_SLACK = 1 + 1e-9
+
+L33T_TABLE: Dict[str, str] = {
+    "a": "4@",
+    "b": "8",
+    "c": "({[<",
+    "e": "3",
+    "g": "69",
+    "i": "1!|",
+    "l": "1|7",
+    "o": "0",
+    "s": "$5",
+    "t": "+7",
+    "x": "%",
+    "z": "2",
+}
+
+# substituted character -> letters it may stand for
+L33T_REVERSE: Dict[str, Tuple[str, ...]] = {}
+for _letter, _subs in L33T_TABLE.items():
+    for _sub in _subs:
+        L33T_REVERSE[_sub] = L33T_REVERSE.get(_sub, ()) + (_letter,)
+
+# typed character -> (letter, substituted char or None) readings to try
+L33T_OPTIONS: Dict[str, Tuple[Tuple[str, Optional[str]], ...]] = {
+    sub: ((sub, None),) + tuple((letter, sub) for letter in letters) for sub, letters in L33T_REVERSE.items()
+}
+
+# Cap on simultaneous l33t interpretations followed per start position.
+MAX_L33T_BRANCHES = 8
+
+# Slanted QWERTY rows (unshifted + shifted per key) and the column of their first key.
+# Key x of row y sits between keys x and x+1 of row y-1.
+QWERTY_ROWS = (
+    (0, ["`~", "1!", "2@", "3#", "4$", "5%", "6^", "7&", "8*", "9(", "0)", "-_", "=+"]),
+    (1, ["qQ", "wW", "eE", "rR", "tT", "yY", "uU", "iI", "oO", "pP", "[{", "]}", "\\|"]),
+    (1, ["aA", "sS", "dD", "fF", "gG", "hH", "jJ", "kK", "lL", ";:", "'\""]),
+    (1, ["zZ", "xX", "cC", "vV", "bB", "nN", "mM", ",<", ".>", "/?"]),
+)
+
+REPEAT_RE = re.compile(r"(.+)\1+")
+REPEAT_LAZY_RE = re.compile(r"(.+?)\1+")
+YEAR_RE = re.compile(r"19\d\d|20\d\d")
+DATE_SEP_RE = re.compile(r"^(\d{1,4})([\s/\\_.-])(\d{1,2})\2(\d{1,4})$")
+
+
+@dataclass(frozen=True)
+class Match:
+    pattern: str
+    i: int
+    j: int
+    token: str
+    guesses: float
+    detail: str = ""
+    dictionary: str = ""
+    rank: int = 0
+
+
+@dataclass(frozen=True)
+class Strength:
+    password: str
+    guesses: float
+    score: int
+    sequence: Tuple[Match, ...]
+
+    @property
+    def guesses_log10(self) -> float:
+        return math.log10(self.guesses)
+
+
+@dataclass(frozen=True)
+class _Frequency:
+    """
+    Every ranked word, sorted, with parallel compact rank/list-id arrays and
+    the [lo, hi) slice of `words` sharing each 1- and 2-character prefix.
+    """
+
+    words: Tuple[str, ...]
+    ranks: array
+    sources: array
+    prefix_ranges: Dict[str, Tuple[int, int]]
+    max_len: int
+
+
+@lru_cache(maxsize=1)
+def load_frequency_lists() -> _Frequency:
+    """
+    Loads and merges the ranked frequency lists once per process.
+
+    Expected files inside container:
+      /app/data/frequency/<name>.txt  (one word per line, most common first)
+
+    A word found in several lists keeps its best (lowest) rank.
+    """
+    best: Dict[str, Tuple[int, int]] = {}
+    for source, name in enumerate(DICTIONARIES):
+        path = FREQUENCY_DIR / f"{name}.txt"
+        if not path.exists():
+            raise FileNotFoundError(
+                f"Missing frequency list at {path}. "
+                f"Ensure labs/lab2-account-security-clinic/data/frequency/ exists in the repo and "
+                f"the lab image was rebuilt."
+            )
+        with open(path, "r", encoding="utf-8") as f:
+            rank = 0
+            for line in f:
+                word = line.strip()
+                if not word or word.startswith("#"):
+                    continue
+                rank += 1
+                if word not in best or rank < best[word][0]:
+                    best[word] = (rank, source)
+
+    words = tuple(sorted(best))
+    prefix_ranges: Dict[str, Tuple[int, int]] = {}
+    for k, word in enumerate(words):
+        for prefix in (word[:1], word[:2]):
+            lo, _ = prefix_ranges.get(prefix, (k, k))
+            prefix_ranges[prefix] = (lo, k + 1)
+
+    return _Frequency(
+        words=words,
+        ranks=array("I", (best[w][0] for w in words)),
+        sources=array("B", (best[w][1] for w in words)),
+        prefix_ranges=prefix_ranges,
+        max_len=max(map(len, words), default=0),
+    )
+
+
+@lru_cache(maxsize=1)
+def _qwerty_graph() -> Dict[str, Tuple[Optional[str], ...]]:
+    """key char -> neighbouring keys in fixed direction order (None where no key)."""
+    positions: Dict[Tuple[int, int], str] = {}
+    for y, (start, keys) in enumerate(QWERTY_ROWS):
+        for offset, key in enumerate(keys):
+            positions[(start + offset, y)] = key
+
+    graph: Dict[str, Tuple[Optional[str], ...]] = {}
+    for (x, y), key in positions.items():
+        around = [(x - 1, y), (x, y - 1), (x + 1, y - 1), (x + 1, y), (x, y + 1), (x - 1, y + 1)]
+        neighbours = tuple(positions.get(p) for p in around)
+        for ch in key:
+            graph[ch] = neighbours
+    return graph
+
+
+@lru_cache(maxsize=1)
+def _qwerty_stats() -> Tuple[int, float]:
+    """(number of key characters, average neighbour count) for spatial guesses."""
+    graph = _qwerty_graph()
+    degree = sum(sum(1 for k in v if k) for v in graph.values()) / len(graph)
+    return len(graph), degree
+
+
+# ---------------------------------------------------------------------------
+# Matchers
+# ---------------------------------------------------------------------------
+
+
+def _dictionary_matches(password: str) -> List[Match]:
+    """
+    Dictionary and l33t matches in one pass. From each start position the
+    candidate is extended one character at a time. Short prefixes map straight
+    to their slice of the sorted word array; after that a single bisect inside
+    the slice answers both "is this a word" and "can any word start like
+    this", so hopeless prefixes are dropped immediately. Start positions whose
+    next max_len characters were already seen (repetitive input such as
+    "1|1|1|...") reuse those matches, shifted.
+    """
+    freq = load_frequency_lists()
+    words, ranks, sources, prefix_ranges = freq.words, freq.ranks, freq.sources, freq.prefix_ranges
+    lower = password.lower()
+    n = len(password)
+    matches: List[Match] = []
+    seen: Dict[str, Tuple[int, List[Match]]] = {}
+
+    for i in range(n):
+        window = password[i:i + freq.max_len]
+        if window in seen:
+            first, found = seen[window]
+            matches.extend(replace(m, i=i, j=m.j - first + i) for m in found)
+            continue
+        found = []
+        seen[window] = (i, found)
+        # (candidate so far, substitutions used as ((sub, letter), ...), slice of `words`)
+        frontier: List[Tuple[str, Tuple[Tuple[str, str], ...], int, int]] = [("", (), 0, len(words))]
+        for j in range(i, n):
+            c = lower[j]
+            options = L33T_OPTIONS.get(c) or ((c, None),)
+            nxt = []
+            for prefix, subs, lo, hi in frontier:
+                for ch, sub in options:
+                    cand = prefix + ch
+                    if len(cand) <= 2:
+                        span = prefix_ranges.get(cand)
+                        if span is None:
+                            continue
+                        k, k_hi = span
+                    else:
+                        k = bisect_left(words, cand, lo, hi)
+                        if k == hi or not words[k].startswith(cand):
+                            continue
+                        k_hi = hi
+                    cand_subs = subs + ((sub, ch),) if sub else subs
+                    nxt.append((cand, cand_subs, k, k_hi))
+                    # a lone substituted character ("!" as "i") is not a word
+                    if words[k] == cand and (j > i or not cand_subs):
+                        token = password[i:j + 1]
+                        guesses = ranks[k] * _uppercase_variations(token) * _l33t_variations(token, cand_subs)
+                        kind = "l33t" if cand_subs else "dictionary"
+                        source = DICTIONARIES[sources[k]]
+                        detail = f"{source} #{ranks[k]}"
+                        if cand_subs:
+                            detail += f" as '{cand}'"
+                        found.append(Match(kind, i, j, token, guesses, detail, source, ranks[k]))
+            if not nxt:
+                break
+            frontier = nxt[:MAX_L33T_BRANCHES]
+        matches.extend(found)
+    return matches
+
+
+def _spatial_matches(password: str) -> List[Match]:
+    graph = _qwerty_graph()
+    n = len(password)
+    starts, degree = _qwerty_stats()
+    matches: List[Match] = []
+
+    i = 0
+    while i < n - 2:
+        j = i
+        turns = 0
+        shifted = 1 if password[i] in "~!@#$%^&*()_+{}|:\"<>?" or password[i].isupper() else 0
+        last_direction = None
+        while j + 1 < n:
+            cur, nxt = password[j], password[j + 1]
+            direction = None
+            for d, key in enumerate(graph.get(cur, ())):
+                if key and nxt in key:
+                    direction = d
+                    if key.index(nxt) == 1:
+                        shifted += 1
+                    break
+            if direction is None:
+                break
+            if direction != last_direction:
+                turns += 1
+                last_direction = direction
+            j += 1
+
+        if j - i >= 2:
+            token = password[i:j + 1]
+            guesses = _spatial_guesses(len(token), turns, shifted, starts, degree)
+            matches.append(Match("spatial", i, j, token, guesses, f"qwerty, {turns} turn(s)"))
+        i = j + 1 if j > i else i + 1
+    return matches
+
+
+def _spatial_guesses(length: int, turns: int, shifted: int, starts: int, degree: float) -> float:
+    guesses = 0.0
+    for i in range(2, length + 1):
+        for t in range(1, min(turns, i - 1) + 1):
+            guesses += math.comb(i - 1, t - 1) * starts * degree ** t
+    unshifted = length - shifted
+    if shifted:
+        if unshifted == 0:
+            guesses *= 2
+        else:
+            guesses *= sum(math.comb(length, k) for k in range(1, min(shifted, unshifted) + 1))
+    return guesses
+
+
+def _repeat_matches(password: str, memo: Dict[str, float]) -> List[Match]:
+    matches: List[Match] = []
+    pos = 0
+    n = len(password)
+    while pos < n:
+        greedy = REPEAT_RE.search(password, pos)
+        if not greedy:
+            break
+        lazy = REPEAT_LAZY_RE.search(password, pos)
+        if len(greedy.group(0)) > len(lazy.group(0)):
+            # e.g. "aabaab": greedy finds the longer "aab" x2 repeat
+            found = greedy
+            base = REPEAT_LAZY_RE.fullmatch(found.group(0)).group(1)
+        else:
+            found = lazy
+            base = found.group(1)
+        i, j = found.start(), found.end() - 1
+        repeats = len(found.group(0)) // len(base)
+        if len(base) <= MAX_REPEAT_BASE:
+            base_guesses = _guesses(base, memo)
+        else:
+            base_guesses = _bruteforce_guesses(len(base))
+        guesses = base_guesses * repeats
+        matches.append(Match("repeat", i, j, found.group(0), guesses, f"'{base}' x{repeats}"))
+        pos = j + 1
+    return matches
+
+
+def _sequence_matches(password: str) -> List[Match]:
+    matches: List[Match] = []
+    n = len(password)
+    if n < 3:
+        return matches
+
+    def emit(i: int, j: int, delta: int) -> None:
+        if j - i >= 2 and 0 < abs(delta) <= 5:
+            token = password[i:j + 1]
+            first = token[0]
+            if first in "aAzZ019":
+                base = 4
+            elif first.isdigit():
+                base = 10
+            else:
+                base = 26
+            if delta < 0:
+                base *= 2
+            matches.append(Match("sequence", i, j, token, base * len(token), f"step {delta:+d}"))
+
+    i = 0
+    last_delta = None
+    for k in range(1, n):
+        delta = ord(password[k]) - ord(password[k - 1])
+        if last_delta is None:
+            last_delta = delta
+        if delta == last_delta:
+            continue
+        emit(i, k - 1, last_delta)
+        i = k - 1
+        last_delta = delta
+    emit(i, n - 1, last_delta)
+    return matches
+
+
+def _date_matches(password: str) -> List[Match]:
+    matches: List[Match] = []
+    n = len(password)
+
+    for m in YEAR_RE.finditer(password):
+        year = int(m.group(0))
+        guesses = max(abs(year - REFERENCE_YEAR), MIN_YEAR_SPACE)
+        matches.append(Match("date", m.start(), m.end() - 1, m.group(0), guesses, "year"))
+
+    # token -> (year or None, has separators); runs like "0000..." repeat tokens
+    seen: Dict[str, Tuple[Optional[int], bool]] = {}
+    for i in range(n):
+        if not password[i].isdigit():
+            continue
+        found = 0
+        # Longest windows first: they cover the most, so they are the ones to keep
+        for j in range(min(n, i + 10) - 1, i + 2, -1):
+            token = password[i:j + 1]
+            if token not in seen:
+                seen[token] = _date_year(token)
+            year, sep = seen[token]
+            if year is None:
+                continue
+            guesses = 365 * max(abs(year - REFERENCE_YEAR), MIN_YEAR_SPACE) * (4 if sep else 1)
+            matches.append(Match("date", i, j, token, guesses, f"date, year {year}"))
+            found += 1
+            if found == MAX_DATE_WINDOWS:
+                break
+    return matches
+
+
+def _date_year(token: str) -> Tuple[Optional[int], bool]:
+    """(year of the most plausible date reading or None, whether it uses separators)."""
+    if token.isdigit():
+        if len(token) > 8:
+            return None, False
+        return _best_date_year(_digit_splits(token)), False
+    sm = DATE_SEP_RE.match(token)
+    if not sm:
+        return None, True
+    return _best_date_year([(int(sm.group(1)), int(sm.group(3)), int(sm.group(4)))]), True
+
+
+def _digit_splits(token: str) -> List[Tuple[int, int, int]]:
+    out = []
+    n = len(token)
+    for a in range(1, n - 1):
+        for b in range(a + 1, n):
+            parts = (token[:a], token[a:b], token[b:])
+            if all(len(p) <= 4 for p in parts):
+                out.append(tuple(int(p) for p in parts))
+    return out
+
+
+def _best_date_year(candidates: List[Tuple[int, int, int]]) -> Optional[int]:
+    """Year of the most plausible day/month/year reading, or None."""
+    best = None
+    for a, b, c in candidates:
+        for year, rest in ((a, (b, c)), (c, (a, b))):
+            if year > 2050 or (99 < year < 1000):
+                continue
+            if year <= 99:
+                year += 1900 if year > 50 else 2000
+            x, y = rest
+            if (1 <= x <= 12 and 1 <= y <= 31) or (1 <= y <= 12 and 1 <= x <= 31):
+                if best is None or abs(year - REFERENCE_YEAR) < abs(best - REFERENCE_YEAR):
+                    best = year
+    return best
+
+
+def _uppercase_variations(token: str) -> float:
+    if token.islower() or not any(c.isalpha() for c in token):
+        return 1
+    if token.isupper() or (token[0].isupper() and token[1:].islower()) or (
+        token[-1].isupper() and token[:-1].islower()
+    ):
+        return 2
+    upper = sum(1 for c in token if c.isupper())
+    lower = sum(1 for c in token if c.islower())
+    return sum(math.comb(upper + lower, k) for k in range(1, min(upper, lower) + 1))
+
+
+def _l33t_variations(token: str, subs: Tuple[Tuple[str, str], ...]) -> float:
+    if not subs:
+        return 1
+    variations = 1
+    lower = token.lower()
+    for sub, letter in set(subs):
+        s = lower.count(sub)
+        u = lower.count(letter)
+        if s == 0 or u == 0:
+            variations *= 2
+        else:
+            variations *= sum(math.comb(s + u, k) for k in range(1, min(s, u) + 1))
+    return variations
+
+
+# ---------------------------------------------------------------------------
+# Scoring
+# ---------------------------------------------------------------------------
+
+
+def _all_matches(password: str, memo: Optional[Dict[str, float]] = None) -> List[Match]:
+    return (
+        _dictionary_matches(password)
+        + _spatial_matches(password)
+        + _repeat_matches(password, {} if memo is None else memo)
+        + _sequence_matches(password)
+        + _date_matches(password)
+    )
+
+
+@lru_cache(maxsize=None)
+def _factorials(n: int) -> Tuple[float, ...]:
+    return tuple(float(math.factorial(length)) for length in range(n + 2))
+
+
+@lru_cache(maxsize=None)
+def _sequence_penalties(n: int) -> Tuple[float, ...]:
+    return tuple(float(MIN_GUESSES_BEFORE_GROWING_SEQUENCE) ** max(length - 1, 0) for length in range(n + 2))
+
+
+@lru_cache(maxsize=None)
+def _bruteforce_guesses(length: int) -> float:
+    floor = MIN_SUBMATCH_GUESSES_SINGLE_CHAR if length == 1 else MIN_SUBMATCH_GUESSES_MULTI_CHAR
+    return max(float(BRUTEFORCE_CARDINALITY) ** length, floor + 1)
+
+
+def _open_ends(slot: Dict[int, tuple]) -> Tuple[List[int], float]:
+    """Entries of a finished DP slot that a bruteforce span may follow (not bruteforce themselves)."""
+    lengths = [length for length, entry in slot.items() if type(entry[2]) is not int]
+    return lengths, min((slot[length][1] for length in lengths), default=0.0)
+
+
+def _most_guessable_sequence(password: str, matches: List[Match]) -> Tuple[float, Tuple[Match, ...]]:
+    """
+    Picks the non-overlapping cover of the password with the fewest guesses.
+
+    For each end position k and sequence length l we keep the best product of
+    guesses; a sequence of l parts costs l! * product + D ** (l - 1) so that a
+    short cover beats a long chain of tiny matches. Bruteforce spans are kept
+    as plain start indices and only turned into Match objects for the winner.
+    """
+    n = len(password)
+    by_end: List[List[Match]] = [[] for _ in range(n)]
+    for m in matches:
+        floor = MIN_SUBMATCH_GUESSES_SINGLE_CHAR if m.j == m.i else MIN_SUBMATCH_GUESSES_MULTI_CHAR
+        if m.guesses < floor:
+            m = replace(m, guesses=floor)
+        by_end[m.j].append(m)
+
+    # best[k][l] = (g, product of guesses, step); step is a Match or, for a
+    # bruteforce span ending at k, the int index where that span starts.
+    best: List[Dict[int, tuple]] = [{} for _ in range(n)]
+    factorial = _factorials(n)
+    penalty = _sequence_penalties(n)
+
+    # Cost of the cheapest complete cover seen so far. Extending a partial
+    # cover never lowers its cost, so anything at or above it is dropped.
+    bound = [_bruteforce_guesses(n) + 1]
+    for m in by_end[n - 1]:
+        if m.i == 0:
+            bound[0] = min(bound[0], m.guesses + 1)
+
+    def update(k: int, guesses: float, prev: Optional[Dict[int, tuple]], step, length: int) -> None:
+        pi = guesses if prev is None else guesses * prev[length - 1][1]
+        g = factorial[length] * pi + penalty[length]
+        if g > bound[0] * BOUND_SLACK:
+            return
+        slot = best[k]
+        for other_l, other in slot.items():
+            if other_l <= length and other[0] <= g:
+                return
+        slot[length] = (g, pi, step)
+        # finishing with a bruteforce tail gives a complete cover to bound by
+        # (not after a bruteforce span: those are merged, never chained)
+        tail = n - 1 - k
+        if tail == 0:
+            done = g
+        elif type(step) is int:
+            return
+        else:
+            done = factorial[length + 1] * (_bruteforce_guesses(tail) * pi) + penalty[length + 1]
+        if done < bound[0]:
+            bound[0] = done
+
+    match_starts = {m.i for m in matches}
+    # per finished slot: lengths a bruteforce span may follow, and their lowest product
+    open_ends: List[Tuple[List[int], float]] = []
+    for k in range(n):
+        for m in by_end[k]:
+            if m.i > 0:
+                prev = best[m.i - 1]
+                for length in list(prev):
+                    update(k, m.guesses, prev, m, length + 1)
+            else:
+                update(k, m.guesses, None, m, 1)
+
+        # Bruteforce spans never chain, so one ending at k is only useful if
+        # a match starts right after it or it finishes the password.
+        if k < n - 1 and k + 1 not in match_starts:
+            open_ends.append(_open_ends(best[k]))
+            continue
+
+        update(k, _bruteforce_guesses(k + 1), None, 0, 1)
+        for i in range(1, k + 1):
+            lengths, min_pi = open_ends[i - 1]
+            if not lengths:
+                continue
+            bf = _bruteforce_guesses(k - i + 1)
+            # even the cheapest extension (2! * bf * pi) is already too costly
+            if 2 * bf * min_pi > bound[0] * BOUND_SLACK:
+                continue
+            prev = best[i - 1]
+            for length in lengths:
+                update(k, bf, prev, i, length + 1)
+
+        open_ends.append(_open_ends(best[k]))
+
+    k = n - 1
+    length, (g, _, _) = min(best[k].items(), key=lambda item: item[1][0])
+    sequence: List[Match] = []
+    while k >= 0:
+        step = best[k][length][2]
+        if type(step) is int:
+            step = Match("bruteforce", step, k, password[step:k + 1], _bruteforce_guesses(k - step + 1))
+        sequence.append(step)
+        k = step.i - 1
+        length -= 1
+    sequence.reverse()
+    return g, tuple(sequence)
+
+
+def _guesses(password: str, memo: Dict[str, float]) -> float:
+    # `memo` lives for one check only, so repeated sub-tokens are scored once
+    # without keeping pieces of passwords around afterwards.
+    if password not in memo:
+        memo[password] = _most_guessable_sequence(password, _all_matches(password, memo))[0] if password else 1.0
+    return memo[password]
+
+
+def estimate_guesses(password: str) -> float:
+    """Guess count only."""
+    return _guesses(password, {})
+
+
+def estimate_strength(password: str) -> Strength:
+    # Not memoized: a full check is cheap enough, and a cache would keep
+    # students' passwords in memory for the life of the process.
+    password = password[:MAX_LENGTH]
+    if not password:
+        return Strength(password="", guesses=1.0, score=0, sequence=())
+    guesses, sequence = _most_guessable_sequence(password, _all_matches(password))
+    return Strength(password=password, guesses=guesses, score=_score(guesses), sequence=sequence)
+
+
+def _score(guesses: float) -> int:
+    delta = 5
+    for score, limit in enumerate((1e3, 1e6, 1e8, 1e10)):
+        if guesses < limit + delta:
+            return score
+    return 4
+
+
+# Attacker models: guesses per second.
+CRACK_RATES = {
+    "online_throttled": 100 / 3600,
+    "online_unthrottled": 10,
+    "offline_slow_hash": 1e4,
+    "offline_fast_hash": 1e10,
+}
+
+
+def crack_times(guesses: float) -> Dict[str, str]:
+    return {name: _display_time(guesses / rate) for name, rate in CRACK_RATES.items()}
+
+
+def _display_time(seconds: float) -> str:
+    if seconds < 1:
+        return "less than a second"
+    for unit, size in (
+        ("century", 100 * 365 * 86400),
+        ("year", 365 * 86400),
+        ("month", 31 * 86400),
+        ("day", 86400),
+        ("hour", 3600),
+        ("minute", 60),
+        ("second", 1),
+    ):
+        if seconds >= size:
+            if unit == "century":
+                return "centuries"
+            n = round(seconds / size)
+            return f"{n} {unit}{'' if n == 1 else 's'}"
+    return "less than a second"
+
+
+def feedback(result: Strength) -> Dict[str, object]:
+    if not result.sequence:
+        return {"warning": "", "suggestions": ["Use a few random words together (a passphrase)."]}
+    if result.score > 2:
+        return {"warning": "", "suggestions": []}
+
+    longest = max(result.sequence, key=lambda m: len(m.token))
+    warning = ""
+    suggestions = ["Add another word or two. Uncommon words are better."]
+
+    if longest.pattern in ("dictionary", "l33t"):
+        if longest.dictionary == "passwords":
+            if longest.rank <= 10:
+                warning = "This is a top-10 common password."
+            elif longest.rank <= 100:
+                warning = "This is a top-100 common password."
+            else:
+                warning = "This is similar to a commonly used password."
+        elif longest.dictionary in ("female_names", "male_names", "surnames"):
+            warning = "Names and surnames by themselves are easy to guess."
+        elif len(result.sequence) == 1:
+            warning = "A word by itself is easy to guess."
+        if longest.token[:1].isupper():
+            suggestions.append("Capitalization doesn't help very much.")
+        if longest.pattern == "l33t":
+            suggestions.append("Predictable substitutions like '@' instead of 'a' don't help very much.")
+    elif longest.pattern == "spatial":
+        warning = "Keyboard patterns like 'qwerty' or 'zxcvbn' are easy to guess."
+        suggestions.append("Avoid keyboard walks, even with turns.")
+    elif longest.pattern == "repeat":
+        warning = "Repeats like 'abcabcabc' are only slightly harder to guess than 'abc'."
+        suggestions.append("Avoid repeated words and characters.")
+    elif longest.pattern == "sequence":
+        warning = "Sequences like 'abc' or '6543' are easy to guess."
+        suggestions.append("Avoid sequences.")
+    elif longest.pattern == "date":
+        warning = "Dates and years are often easy to guess."
+        suggestions.append("Avoid dates and years that are associated with you.")
+
+    return {"warning": warning, "suggestions": suggestions}
+
+
+def strength_report(password: str) -> Dict[str, object]:
+    """JSON-ready summary for the live strength meter."""
+    result = estimate_strength(password)
+    return {
+        "length": len(result.password),
+        "score": result.score,
+        "guesses": result.guesses,
+        "guesses_log10": round(result.guesses_log10, 2),
+        "crack_times": crack_times(result.guesses),
+        "sequence": [
+            {"pattern": m.pattern, "token": m.token, "guesses_log10": round(math.log10(m.guesses), 2), "detail": m.detail}
+            for m in result.sequence
+        ],
+        "feedback": feedback(result),
+    }
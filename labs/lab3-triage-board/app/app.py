@@ -1,24 +1,35 @@
 from __future__ import annotations
 
 import json
+import os
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from flask import Flask, render_template, request
+from werkzeug.middleware.proxy_fix import ProxyFix
 
-EVENTS_PATH = Path("/app/data/events.json")
+from server_timing import ServerTiming, phase
+
+# Primary expected location (baked into the image). Override with the
+# LAB_DATA_DIR environment variable or create_app(data_dir=...).
+DATA_DIR = Path(os.environ.get("LAB_DATA_DIR", "/app/data"))
 
 
 def load_events() -> Dict[str, Any]:
-    if not EVENTS_PATH.exists():
+    path = DATA_DIR / "events.json"
+    if not path.exists():
         raise FileNotFoundError(
-            f"Missing events file at {EVENTS_PATH}. Rebuild the lab3 image."
+            f"Missing events file at {path}. Rebuild the lab3 image."
         )
-    with open(EVENTS_PATH, "r", encoding="utf-8") as f:
+    with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
 
-def create_app() -> Flask:
+def create_app(data_dir: Optional[Path] = None) -> Flask:
+    global DATA_DIR
+    if data_dir is not None:
+        DATA_DIR = Path(data_dir)
+
     # Be explicit so static/templates always resolve correctly in Docker.
     app = Flask(
         __name__,
@@ -27,9 +38,14 @@ def create_app() -> Flask:
         template_folder="templates",
     )
 
+    # Served behind the hub's /lab/<id>/ reverse proxy.
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1, x_prefix=1)
+    ServerTiming(app, label="lab3")
+
     @app.get("/")
     def index():
-        payload = load_events()
+        with phase("data"):
+            payload = load_events()
         instructor = request.args.get("instructor", "").strip().lower() in ("1", "true", "yes", "on")
         title = payload.get("title", "Lab 3 — Threat Detection Workflow: Signal vs Noise")
         scenario = payload.get("scenario", {})
@@ -1,22 +1,33 @@
 from __future__ import annotations
 
 import json
+import os
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from flask import Flask, render_template, request
+from werkzeug.middleware.proxy_fix import ProxyFix
 
-DATA_PATH = Path("/app/data/incident.json")
+from server_timing import ServerTiming, phase
+
+# Primary expected location (baked into the image). Override with the
+# LAB_DATA_DIR environment variable or create_app(data_dir=...).
+DATA_DIR = Path(os.environ.get("LAB_DATA_DIR", "/app/data"))
 
 
 def load_incident() -> Dict[str, Any]:
-    if not DATA_PATH.exists():
-        raise FileNotFoundError(f"Missing incident file at {DATA_PATH}. Rebuild the lab4 image.")
-    with open(DATA_PATH, "r", encoding="utf-8") as f:
+    path = DATA_DIR / "incident.json"
+    if not path.exists():
+        raise FileNotFoundError(f"Missing incident file at {path}. Rebuild the lab4 image.")
+    with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
 
-def create_app() -> Flask:
+def create_app(data_dir: Optional[Path] = None) -> Flask:
+    global DATA_DIR
+    if data_dir is not None:
+        DATA_DIR = Path(data_dir)
+
     app = Flask(
         __name__,
         static_url_path="/static",
@@ -24,9 +35,14 @@ def create_app() -> Flask:
         template_folder="templates",
     )
 
+    # Served behind the hub's /lab/<id>/ reverse proxy.
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1, x_prefix=1)
+    ServerTiming(app, label="lab4")
+
     @app.get("/")
     def index():
-        incident = load_incident()
+        with phase("data"):
+            incident = load_incident()
         instructor = request.args.get("instructor", "").strip().lower() in ("1", "true", "yes", "on")
         return render_template("index.html", incident=incident, instructor=instructor)
 
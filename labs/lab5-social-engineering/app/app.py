@@ -1,31 +1,47 @@
 from __future__ import annotations
 
 import json
+import os
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional
 
 from flask import Flask, render_template, request
+from werkzeug.middleware.proxy_fix import ProxyFix
 
-DATA_PATH = Path("/app/data/scenarios.json")
+from server_timing import ServerTiming, phase
+
+# Primary expected location (baked into the image). Override with the
+# LAB_DATA_DIR environment variable or create_app(data_dir=...).
+DATA_DIR = Path(os.environ.get("LAB_DATA_DIR", "/app/data"))
 
 
 def load_scenarios() -> dict[str, Any]:
-    if not DATA_PATH.exists():
+    path = DATA_DIR / "scenarios.json"
+    if not path.exists():
         raise FileNotFoundError(
-            f"Missing scenarios file at {DATA_PATH}. Ensure labs/lab5-social-engineering/data/scenarios.json "
+            f"Missing scenarios file at {path}. Ensure labs/lab5-social-engineering/data/scenarios.json "
             f"exists in the repo and the lab image was rebuilt."
         )
 
-    with open(DATA_PATH, "r", encoding="utf-8") as f:
+    with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
 
-def create_app() -> Flask:
+def create_app(data_dir: Optional[Path] = None) -> Flask:
+    global DATA_DIR
+    if data_dir is not None:
+        DATA_DIR = Path(data_dir)
+
     app = Flask(__name__)
 
+    # Served behind the hub's /lab/<id>/ reverse proxy.
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1, x_prefix=1)
+    ServerTiming(app, label="lab5")
+
     @app.get("/")
     def index():
-        data = load_scenarios()
+        with phase("data"):
+            data = load_scenarios()
         scenarios = data.get("scenarios", [])
         scenarios = sorted(scenarios, key=lambda s: s.get("id", ""))
         return render_template(
@@ -45,74 +61,76 @@ def create_app() -> Flask:
 
     @app.post("/submit")
     def submit():
-        data = load_scenarios()
-        scenarios = data.get("scenarios", [])
-        scenarios = sorted(scenarios, key=lambda s: s.get("id", ""))
+        with phase("data"):
+            data = load_scenarios()
+            scenarios = data.get("scenarios", [])
+            scenarios = sorted(scenarios, key=lambda s: s.get("id", ""))
 
-        submitted = dict(request.form)
+            submitted = dict(request.form)
 
         results: list[dict[str, Any]] = []
         matched = {"technique": 0, "lever": 0, "goal": 0}
         total = len(scenarios)
 
-        for s in scenarios:
-            sid = s.get("id")
-            # single-choice fields
-            picked_technique = submitted.get(f"{sid}__technique", "")
-            picked_lever = submitted.get(f"{sid}__lever", "")
-            picked_goal = submitted.get(f"{sid}__goal", "")
-            picked_response = submitted.get(f"{sid}__response", "")
-
-            # multi-choice fields
-            picked_shortcuts = request.form.getlist(f"{sid}__shortcuts")
-            picked_guardrails = request.form.getlist(f"{sid}__guardrails")
-
-            correct_technique = s.get("answers", {}).get("technique", "")
-            correct_lever = s.get("answers", {}).get("lever", "")
-            correct_goal = s.get("answers", {}).get("attacker_goal", "")
-
-            ok_technique = picked_technique == correct_technique
-            ok_lever = picked_lever == correct_lever
-            ok_goal = picked_goal == correct_goal
-
-            matched["technique"] += 1 if ok_technique else 0
-            matched["lever"] += 1 if ok_lever else 0
-            matched["goal"] += 1 if ok_goal else 0
-
-            # For multi-select, we don’t treat as “right/wrong”; we show overlap to keep it non-gamified.
-            correct_shortcuts = s.get("answers", {}).get("shortcuts", [])
-            correct_guardrails = s.get("answers", {}).get("teaching_guardrails", [])
-
-            overlap_shortcuts = sorted(set(picked_shortcuts).intersection(set(correct_shortcuts)))
-            overlap_guardrails = sorted(set(picked_guardrails).intersection(set(correct_guardrails)))
-
-            results.append(
-                {
-                    "id": sid,
-                    "channel": s.get("channel", ""),
-                    "artifact": s.get("artifact", ""),
-                    "notes": s.get("notes", ""),
-                    "focus": s.get("focus", {}),
-                    "picked": {
-                        "technique": picked_technique,
-                        "lever": picked_lever,
-                        "goal": picked_goal,
-                        "response": picked_response,
-                        "shortcuts": picked_shortcuts,
-                        "guardrails": picked_guardrails,
-                    },
-                    "answers": s.get("answers", {}),
-                    "ok": {
-                        "technique": ok_technique,
-                        "lever": ok_lever,
-                        "goal": ok_goal,
-                    },
-                    "overlap": {
-                        "shortcuts": overlap_shortcuts,
-                        "guardrails": overlap_guardrails,
-                    },
-                }
-            )
+        with phase("score"):
+            for s in scenarios:
+                sid = s.get("id")
+                # single-choice fields
+                picked_technique = submitted.get(f"{sid}__technique", "")
+                picked_lever = submitted.get(f"{sid}__lever", "")
+                picked_goal = submitted.get(f"{sid}__goal", "")
+                picked_response = submitted.get(f"{sid}__response", "")
+
+                # multi-choice fields
+                picked_shortcuts = request.form.getlist(f"{sid}__shortcuts")
+                picked_guardrails = request.form.getlist(f"{sid}__guardrails")
+
+                correct_technique = s.get("answers", {}).get("technique", "")
+                correct_lever = s.get("answers", {}).get("lever", "")
+                correct_goal = s.get("answers", {}).get("attacker_goal", "")
+
+                ok_technique = picked_technique == correct_technique
+                ok_lever = picked_lever == correct_lever
+                ok_goal = picked_goal == correct_goal
+
+                matched["technique"] += 1 if ok_technique else 0
+                matched["lever"] += 1 if ok_lever else 0
+                matched["goal"] += 1 if ok_goal else 0
+
+                # For multi-select, we don’t treat as “right/wrong”; we show overlap to keep it non-gamified.
+                correct_shortcuts = s.get("answers", {}).get("shortcuts", [])
+                correct_guardrails = s.get("answers", {}).get("teaching_guardrails", [])
+
+                overlap_shortcuts = sorted(set(picked_shortcuts).intersection(set(correct_shortcuts)))
+                overlap_guardrails = sorted(set(picked_guardrails).intersection(set(correct_guardrails)))
+
+                results.append(
+                    {
+                        "id": sid,
+                        "channel": s.get("channel", ""),
+                        "artifact": s.get("artifact", ""),
+                        "notes": s.get("notes", ""),
+                        "focus": s.get("focus", {}),
+                        "picked": {
+                            "technique": picked_technique,
+                            "lever": picked_lever,
+                            "goal": picked_goal,
+                            "response": picked_response,
+                            "shortcuts": picked_shortcuts,
+                            "guardrails": picked_guardrails,
+                        },
+                        "answers": s.get("answers", {}),
+                        "ok": {
+                            "technique": ok_technique,
+                            "lever": ok_lever,
+                            "goal": ok_goal,
+                        },
+                        "overlap": {
+                            "shortcuts": overlap_shortcuts,
+                            "guardrails": overlap_guardrails,
+                        },
+                    }
+                )
 
         summary = {
             "total": total,
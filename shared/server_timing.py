@@ -0,0 +1,387 @@
+"""
+Request timing shared by the Lab Hub and every lab.
+
+    timing = ServerTiming(app, label="lab1")
+
+    with phase("data"):
+        scenarios = load_scenarios()
+
+Each response gets a Server-Timing header (visible in the browser's network
+panel) with the phases recorded during the request, template render time, the
+total, and the response size:
+
+    Server-Timing: data;dur=0.4, score;dur=0.1, render;dur=3.2, total;dur=4.0;desc="lab1", size;desc="18036 B"
+
+Requests slower than WWC_SLOW_MS (default 250) are kept in a rolling window
+at /_timing/slow; event streams (SSE) are left out, since their duration is
+how long a page stayed open. With WWC_PROFILING=1, /_timing/profile starts a
+sampling profiler for one route and /_timing/profile.folded returns its
+stacks in folded format for flamegraph.pl or speedscope. When the profiler is
+off, the only cost is one attribute check per request.
+
+This module has no dependencies beyond Flask. The Dockerfiles copy it from
+shared/ next to each app; from a checkout, put shared/ on PYTHONPATH.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator, Optional
+
+from flask import Blueprint, Flask, Response, has_request_context, jsonify, request, template_rendered
+from flask.signals import before_render_template
+
+ENVIRON_KEY = "wwc.server_timing"
+
+SLOW_MS = float(os.environ.get("WWC_SLOW_MS", "250"))
+SLOW_WINDOW = int(os.environ.get("WWC_SLOW_WINDOW", "100"))
+
+# Starting the profiler is off by default: the labs' /_timing endpoints are
+# reachable by students through the hub's /lab/<id>/ proxy.
+PROFILING = os.environ.get("WWC_PROFILING", "0") == "1"
+
+PROFILE_MAX_SECONDS = 300.0
+PROFILE_MAX_STACKS = 20_000
+
+
+@dataclass
+class RequestTiming:
+    started: float
+    # Phase name -> accumulated milliseconds, in first-seen order
+    phases: dict[str, float] = field(default_factory=dict)
+    route: Optional[str] = None
+    render_started: Optional[float] = None
+
+    def add(self, name: str, ms: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + ms
+
+
+def current_timing() -> Optional[RequestTiming]:
+    if not has_request_context():
+        return None
+    return request.environ.get(ENVIRON_KEY)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """
+    Times a block as a named Server-Timing phase of the current request.
+    Repeated phases accumulate. Outside a request this is a no-op.
+    """
+    timing = current_timing()
+    if timing is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.add(name, (time.perf_counter() - t0) * 1000.0)
+
+
+def _format_header(timing: RequestTiming, total_ms: float, label: str, size: Optional[str]) -> str:
+    parts = [f"{name};dur={ms:.2f}" for name, ms in timing.phases.items()]
+    parts.append(f'total;dur={total_ms:.2f};desc="{label}"')
+    if size is not None:
+        parts.append(f'size;desc="{size} B"')
+    return ", ".join(parts)
+
+
+class TimingMiddleware:
+    """
+    WSGI middleware that times the whole request, including streamed bodies.
+
+    The Server-Timing header is added when the app calls start_response, so
+    "total" is the time to response headers. Bytes and total duration through
+    the last body chunk go to the slow-request window.
+    """
+
+    def __init__(self, wsgi_app, label: str, slow_log: "SlowLog"):
+        self.wsgi_app = wsgi_app
+        self.label = label
+        self.slow_log = slow_log
+
+    def __call__(self, environ, start_response):
+        started = time.perf_counter()
+        timing = RequestTiming(started=started)
+        environ[ENVIRON_KEY] = timing
+        meta: dict = {}
+
+        def timed_start_response(status, headers, exc_info=None):
+            ttfb = (time.perf_counter() - started) * 1000.0
+            size = next((v for k, v in headers if k.lower() == "content-length"), None)
+            content_type = next((v for k, v in headers if k.lower() == "content-type"), "")
+            headers.append(("Server-Timing", _format_header(timing, ttfb, self.label, size)))
+            meta["status"] = status
+            meta["ttfb"] = ttfb
+            meta["stream"] = content_type.startswith("text/event-stream")
+            return start_response(status, headers, exc_info)
+
+        def finished(sent: int) -> None:
+            if meta.get("stream"):
+                return
+            total = (time.perf_counter() - started) * 1000.0
+            if total >= self.slow_log.threshold_ms:
+                self.slow_log.record(environ, timing, meta, total, sent)
+
+        return _TimedBody(self.wsgi_app(environ, timed_start_response), finished)
+
+
+class _TimedBody:
+    """Counts body bytes and reports when the server closes the response."""
+
+    def __init__(self, body, on_close):
+        self.body = body
+        self.on_close = on_close
+        self.sent = 0
+
+    def __iter__(self):
+        for chunk in self.body:
+            self.sent += len(chunk)
+            yield chunk
+
+    def close(self) -> None:
+        try:
+            close = getattr(self.body, "close", None)
+            if close is not None:
+                close()
+        finally:
+            self.on_close(self.sent)
+
+
+class SlowLog:
+    def __init__(self, threshold_ms: float = SLOW_MS, window: int = SLOW_WINDOW):
+        self.threshold_ms = threshold_ms
+        self.entries: deque = deque(maxlen=window)
+
+    def record(self, environ, timing: RequestTiming, meta: dict, total_ms: float, sent: int) -> None:
+        self.entries.append(
+            {
+                "at": time.time(),
+                "method": environ.get("REQUEST_METHOD", ""),
+                "path": environ.get("SCRIPT_NAME", "") + environ.get("PATH_INFO", ""),
+                "query": environ.get("QUERY_STRING", ""),
+                "route": timing.route,
+                "status": meta.get("status"),
+                "total_ms": round(total_ms, 2),
+                "ttfb_ms": round(meta.get("ttfb", 0.0), 2),
+                "bytes": sent,
+                "phases_ms": {k: round(v, 2) for k, v in timing.phases.items()},
+            }
+        )
+
+    def snapshot(self) -> dict:
+        entries = list(self.entries)
+        entries.reverse()
+        return {"threshold_ms": self.threshold_ms, "window": self.entries.maxlen, "requests": entries}
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{Path(code.co_filename).name}:{name}"
+
+
+class SamplingProfiler:
+    """
+    Samples the Python stacks of threads serving one route (Flask rule, or
+    "*" for every route) at a fixed interval, and counts them as folded stacks
+    ("outer;inner;leaf count"). Switches itself off after `seconds`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.route: Optional[str] = None
+        self.interval = 0.005
+        self.deadline = 0.0
+        self.started_at: Optional[float] = None
+        self.samples = 0
+        self.requests = 0
+        self.stacks: Counter = Counter()
+        self._threads: dict[int, str] = {}
+        self._sampler: Optional[threading.Thread] = None
+
+    def wants(self, rule: Optional[str]) -> bool:
+        route = self.route
+        return route is not None and (route == "*" or route == rule)
+
+    def start(self, route: str, seconds: float, interval_ms: float) -> None:
+        with self._lock:
+            self.route = route
+            self.interval = max(interval_ms, 1.0) / 1000.0
+            self.deadline = time.monotonic() + min(max(seconds, 1.0), PROFILE_MAX_SECONDS)
+            self.started_at = time.time()
+            self.samples = 0
+            self.requests = 0
+            self.stacks = Counter()
+            if self._sampler is None or not self._sampler.is_alive():
+                self._sampler = threading.Thread(target=self._run, name="server-timing-profiler", daemon=True)
+                self._sampler.start()
+
+    def stop(self) -> None:
+        with self._lock:
+            self.route = None
+            self._threads.clear()
+
+    def attach(self, route: str) -> None:
+        with self._lock:
+            self._threads[threading.get_ident()] = route
+            self.requests += 1
+
+    def detach(self) -> None:
+        with self._lock:
+            self._threads.pop(threading.get_ident(), None)
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if self.route is not None and time.monotonic() >= self.deadline:
+                    self.route = None
+                    self._threads.clear()
+                if self.route is None:
+                    # Give up the slot in the same critical section, so a
+                    # start() that follows gets a new sampler thread.
+                    self._sampler = None
+                    return
+                threads = dict(self._threads)
+
+            if threads:
+                frames = sys._current_frames()
+                folded = []
+                for tid, route in threads.items():
+                    frame = frames.get(tid)
+                    names = []
+                    while frame is not None:
+                        names.append(_frame_name(frame))
+                        frame = frame.f_back
+                    if names:
+                        names.append(route)
+                        names.reverse()
+                        folded.append(";".join(names))
+                with self._lock:
+                    for stack in folded:
+                        if stack in self.stacks or len(self.stacks) < PROFILE_MAX_STACKS:
+                            self.stacks[stack] += 1
+                            self.samples += 1
+
+            time.sleep(self.interval)
+
+    def status(self) -> dict:
+        with self._lock:
+            remaining = max(0.0, self.deadline - time.monotonic()) if self.route else 0.0
+            return {
+                "enabled": PROFILING,
+                "active": self.route is not None,
+                "route": self.route,
+                "interval_ms": round(self.interval * 1000.0, 2),
+                "remaining_s": round(remaining, 1),
+                "started_at": self.started_at,
+                "requests": self.requests,
+                "samples": self.samples,
+                "unique_stacks": len(self.stacks),
+            }
+
+    def folded(self) -> str:
+        with self._lock:
+            lines = [f"{stack} {count}" for stack, count in self.stacks.most_common()]
+        return "\n".join(lines) + ("\n" if lines else "")
+
+
+class ServerTiming:
+    """
+    Flask extension: installs TimingMiddleware, times template rendering, and
+    registers the /_timing endpoints. Set WWC_SERVER_TIMING=0 to leave an app
+    untouched.
+    """
+
+    def __init__(self, app: Optional[Flask] = None, label: Optional[str] = None):
+        self.label = label
+        self.slow_log = SlowLog()
+        self.profiler = SamplingProfiler()
+        if app is not None:
+            self.init_app(app, label)
+
+    def init_app(self, app: Flask, label: Optional[str] = None) -> None:
+        if os.environ.get("WWC_SERVER_TIMING", "1") == "0":
+            return
+
+        self.label = label or self.label or app.import_name
+        app.extensions["server_timing"] = self
+        app.wsgi_app = TimingMiddleware(app.wsgi_app, self.label, self.slow_log)
+
+        app.before_request(self._before_request)
+        app.teardown_request(self._teardown_request)
+        before_render_template.connect(self._before_render, app)
+        template_rendered.connect(self._after_render, app)
+        app.register_blueprint(self._blueprint())
+
+    def _before_request(self) -> None:
+        timing = request.environ.get(ENVIRON_KEY)
+        rule = request.url_rule.rule if request.url_rule is not None else None
+        if timing is not None:
+            timing.route = rule
+        if self.profiler.wants(rule):
+            request.environ["wwc.server_timing.profiled"] = True
+            self.profiler.attach(rule or request.path)
+
+    def _teardown_request(self, exc: Optional[BaseException]) -> None:
+        if request.environ.get("wwc.server_timing.profiled"):
+            self.profiler.detach()
+
+    def _before_render(self, sender, **extra) -> None:
+        timing = current_timing()
+        if timing is not None:
+            timing.render_started = time.perf_counter()
+
+    def _after_render(self, sender, **extra) -> None:
+        timing = current_timing()
+        if timing is not None and timing.render_started is not None:
+            timing.add("render", (time.perf_counter() - timing.render_started) * 1000.0)
+            timing.render_started = None
+
+    def _blueprint(self) -> Blueprint:
+        bp = Blueprint("server_timing", __name__, url_prefix="/_timing")
+
+        @bp.get("/slow")
+        def slow():
+            return jsonify(self.slow_log.snapshot())
+
+        @bp.get("/profile")
+        def profile_status():
+            return jsonify(self.profiler.status())
+
+        @bp.post("/profile")
+        def profile_start():
+            if not PROFILING:
+                return jsonify({"error": "Profiling is disabled; set WWC_PROFILING=1 to enable it."}), 403
+            payload = request.get_json(silent=True) or {}
+            values = {**request.values.to_dict(), **payload}
+            route = str(values.get("route", "")).strip()
+            if not route:
+                return jsonify({"error": "Pass route=<Flask rule, e.g. /submit> or route=*"}), 400
+            try:
+                seconds = float(values.get("seconds", 30))
+                interval_ms = float(values.get("interval_ms", 5))
+            except (TypeError, ValueError):
+                return jsonify({"error": "seconds and interval_ms must be numbers"}), 400
+            self.profiler.start(route, seconds, interval_ms)
+            return jsonify(self.profiler.status())
+
+        @bp.post("/profile/stop")
+        def profile_stop():
+            if not PROFILING:
+                return jsonify({"error": "Profiling is disabled; set WWC_PROFILING=1 to enable it."}), 403
+            self.profiler.stop()
+            return jsonify(self.profiler.status())
+
+        @bp.get("/profile.folded")
+        def profile_folded():
+            return Response(self.profiler.folded(), mimetype="text/plain")
+
+        return bp
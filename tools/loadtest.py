@@ -0,0 +1,522 @@
+"""
+Classroom load generator for the Lab Hub and the labs' hot endpoints.
+
+Simulates N students working through a lab at once: each student keeps one
+keep-alive connection (like a browser tab), loads the page, "thinks", submits
+a form built from the lab's own data files, thinks again, and repeats.
+
+Examples:
+
+    # 40 students on lab1 through the hub's /lab/lab1/ proxy for 60 s
+    python tools/loadtest.py lab1 --students 40 --duration 60
+
+    # Against a lab run directly from a checkout (it needs shared/ on the path
+    # and its data directory, which the image normally provides):
+    #   PYTHONPATH=shared LAB_DATA_DIR=labs/lab5-social-engineering/data \
+    #       python labs/lab5-social-engineering/app/app.py
+    python tools/loadtest.py lab5 --url http://127.0.0.1:5000/ --students 25
+
+    # Compare against a saved run of the same scenario, target and class size
+    python tools/loadtest.py lab1 --json after.json --compare before.json
+
+Only the Python standard library is used, so this runs from any checkout.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
+from urllib.parse import urlencode, urlsplit
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+LABS_JSON = REPO_ROOT / "labs" / "labs.json"
+
+CIA = ["Confidentiality", "Integrity", "Availability"]
+
+
+# --- HTTP/1.1 client (keep-alive, one connection per simulated student) ---
+
+class HTTPError(Exception):
+    pass
+
+
+@dataclass
+class Reply:
+    status: int
+    headers: dict[str, str]
+    body: bytes
+
+
+class Connection:
+    def __init__(self, host: str, port: int, timeout: float):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def _connect(self) -> None:
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout
+        )
+
+    async def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+        self.reader = self.writer = None
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        body: bytes = b"",
+        content_type: Optional[str] = None,
+        until: Optional[Callable[[bytes], bool]] = None,
+    ) -> Reply:
+        """
+        Sends one request, reconnecting once if the server dropped an idle
+        keep-alive connection. `until` stops reading a streamed (SSE) body as
+        soon as it returns True for the bytes received so far.
+        """
+        for attempt in (0, 1):
+            fresh = self.writer is None
+            try:
+                if fresh:
+                    await self._connect()
+                return await asyncio.wait_for(
+                    self._exchange(method, path, body, content_type, until), self.timeout
+                )
+            except (OSError, asyncio.IncompleteReadError) as e:
+                await self.close()
+                if fresh or attempt:
+                    raise HTTPError(f"connection failed: {e}") from e
+            except asyncio.TimeoutError as e:
+                await self.close()
+                raise HTTPError("timeout") from e
+        raise HTTPError("unreachable")
+
+    async def _exchange(self, method, path, body, content_type, until) -> Reply:
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}", "User-Agent: wwc2025-loadtest"]
+        if body:
+            lines.append(f"Content-Length: {len(body)}")
+        if content_type:
+            lines.append(f"Content-Type: {content_type}")
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readuntil(b"\r\n")
+        parts = status_line.split(b" ", 2)
+        if len(parts) < 2 or not parts[0].startswith(b"HTTP/"):
+            raise ConnectionError(f"bad status line: {status_line!r}")
+        status = int(parts[1])
+
+        headers: dict[str, str] = {}
+        while True:
+            line = await self.reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            k, _, v = line.decode("latin-1").partition(":")
+            headers[k.strip().lower()] = v.strip()
+
+        data = bytearray()
+        keep_alive = headers.get("connection", "").lower() != "close" and parts[0] == b"HTTP/1.1"
+
+        if method == "HEAD" or status in (204, 304):
+            pass
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                size = int((await self.reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                if size == 0:
+                    await self.reader.readuntil(b"\r\n")
+                    break
+                data += await self.reader.readexactly(size)
+                await self.reader.readexactly(2)
+                if until is not None and until(bytes(data)):
+                    keep_alive = False
+                    break
+        elif "content-length" in headers:
+            data += await self.reader.readexactly(int(headers["content-length"]))
+        else:
+            # Body delimited by connection close (SSE from the dev server, HTTP/1.0)
+            keep_alive = False
+            while True:
+                chunk = await self.reader.read(65536)
+                if not chunk:
+                    break
+                data += chunk
+                if until is not None and until(bytes(data)):
+                    break
+
+        if not keep_alive:
+            await self.close()
+        return Reply(status=status, headers=headers, body=bytes(data))
+
+
+# --- Payloads built from each lab's data files ---
+
+def _lab_data(lab_id: str) -> Path:
+    with open(LABS_JSON, "r", encoding="utf-8") as f:
+        labs = json.load(f).get("labs", [])
+    lab = next((l for l in labs if l["id"] == lab_id), None)
+    if not lab:
+        raise SystemExit(f"Unknown lab id in labs.json: {lab_id}")
+    return REPO_ROOT / "labs" / lab.get("path", "") / "data"
+
+
+def _load_json(path: Path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def lab1_submit_form(rng: random.Random, accuracy: float) -> Callable[[], bytes]:
+    scenarios = _load_json(_lab_data("lab1") / "scenarios.json").get("scenarios", [])
+
+    def build() -> bytes:
+        fields = []
+        for s in scenarios:
+            pick = s.get("primary") if rng.random() < accuracy else rng.choice(CIA)
+            fields.append((s.get("id", ""), pick))
+        return urlencode(fields).encode("ascii")
+
+    return build
+
+
+def lab5_submit_form(rng: random.Random, accuracy: float) -> Callable[[], bytes]:
+    data = _load_json(_lab_data("lab5") / "scenarios.json")
+    scenarios = data.get("scenarios", [])
+    options = {
+        "technique": data.get("technique_options", []),
+        "lever": data.get("lever_options", []),
+        "goal": data.get("attacker_goal_options", []),
+        "response": data.get("response_options", []),
+        "shortcuts": data.get("shortcut_options", []),
+        "guardrails": data.get("teaching_guardrail_options", []),
+    }
+
+    def single(correct: str, choices: list[str]) -> str:
+        if correct and rng.random() < accuracy:
+            return correct
+        return rng.choice(choices) if choices else ""
+
+    def multi(choices: list[str]) -> list[str]:
+        if not choices:
+            return []
+        return rng.sample(choices, rng.randint(1, min(3, len(choices))))
+
+    def build() -> bytes:
+        fields = []
+        for s in scenarios:
+            sid = s.get("id", "")
+            answers = s.get("answers", {})
+            fields.append((f"{sid}__technique", single(answers.get("technique", ""), options["technique"])))
+            fields.append((f"{sid}__lever", single(answers.get("lever", ""), options["lever"])))
+            fields.append((f"{sid}__goal", single(answers.get("attacker_goal", ""), options["goal"])))
+            fields.append((f"{sid}__response", rng.choice(options["response"]) if options["response"] else ""))
+            fields.extend((f"{sid}__shortcuts", v) for v in multi(options["shortcuts"]))
+            fields.extend((f"{sid}__guardrails", v) for v in multi(options["guardrails"]))
+        return urlencode(fields).encode("utf-8")
+
+    return build
+
+
+# --- Student sessions ---
+
+@dataclass
+class EndpointStats:
+    latencies_ms: list[float] = field(default_factory=list)
+    errors: int = 0
+    status: dict[int, int] = field(default_factory=dict)
+    bytes_in: int = 0
+    # Error reason -> count, e.g. {"HTTP 503": 12, "timeout": 1}
+    error_reasons: dict[str, int] = field(default_factory=dict)
+
+    def record(self, ms: float, status: Optional[int], nbytes: int = 0, error: Optional[str] = None) -> None:
+        if status is not None:
+            self.status[status] = self.status.get(status, 0) + 1
+        if error is None:
+            self.latencies_ms.append(ms)
+            self.bytes_in += nbytes
+        else:
+            self.errors += 1
+            self.error_reasons[error] = self.error_reasons.get(error, 0) + 1
+
+
+class Run:
+    def __init__(self, base_url: str, timeout: float):
+        u = urlsplit(base_url)
+        if u.scheme != "http":
+            raise SystemExit("Only http:// URLs are supported (point at the hub or a lab directly).")
+        self.host = u.hostname or "127.0.0.1"
+        self.port = u.port or 80
+        self.prefix = u.path.rstrip("/")
+        self.timeout = timeout
+        self.stats: dict[str, EndpointStats] = {}
+
+    def connection(self) -> Connection:
+        return Connection(self.host, self.port, self.timeout)
+
+    async def call(
+        self,
+        conn: Connection,
+        name: str,
+        method: str,
+        path: str,
+        body: bytes = b"",
+        content_type: Optional[str] = None,
+        until: Optional[Callable[[bytes], bool]] = None,
+        check: Optional[Callable[[Reply], Optional[str]]] = None,
+    ) -> None:
+        stats = self.stats.setdefault(name, EndpointStats())
+        started = time.perf_counter()
+        try:
+            reply = await conn.request(method, self.prefix + path, body, content_type, until)
+        except HTTPError as e:
+            stats.record((time.perf_counter() - started) * 1000.0, None, error=str(e))
+            return
+        ms = (time.perf_counter() - started) * 1000.0
+
+        error = None
+        if reply.status >= 400:
+            error = f"HTTP {reply.status}"
+        elif check is not None:
+            error = check(reply)
+        stats.record(ms, reply.status, len(reply.body), error)
+
+
+def _think(rng: random.Random, mean: float) -> float:
+    # Exponential think time, capped so one unlucky draw doesn't idle a student for the whole run
+    return min(rng.expovariate(1.0 / mean), mean * 4) if mean > 0 else 0.0
+
+
+def _sse_finished(data: bytes) -> bool:
+    return b'"type": "done"' in data or b'"type": "error"' in data
+
+
+def _sse_check(reply: Reply) -> Optional[str]:
+    for line in reply.body.decode("utf-8", "replace").splitlines():
+        if line.startswith("data: ") and '"type": "error"' in line:
+            return json.loads(line[6:]).get("message", "error event")
+    if not _sse_finished(reply.body):
+        return "stream ended without a done event"
+    return None
+
+
+async def student(run: Run, scenario: str, rng: random.Random, think: float, deadline: float, accuracy: float) -> None:
+    conn = run.connection()
+    # Stagger arrivals like a class opening the link over a few seconds
+    await asyncio.sleep(rng.uniform(0, min(think, 3.0)) if think else 0)
+
+    if scenario == "lab1":
+        build = lab1_submit_form(rng, accuracy)
+    elif scenario == "lab5":
+        build = lab5_submit_form(rng, accuracy)
+    else:
+        build = None
+
+    form = "application/x-www-form-urlencoded"
+    try:
+        while time.monotonic() < deadline:
+            if scenario in ("lab1", "lab5"):
+                await run.call(conn, "GET /", "GET", "/")
+                await asyncio.sleep(_think(rng, think))
+                await run.call(conn, "POST /submit", "POST", "/submit", build(), form)
+            elif scenario == "lab3":
+                instructor = rng.random() < 0.1
+                await run.call(conn, "GET /?instructor=1" if instructor else "GET /", "GET",
+                               "/?instructor=1" if instructor else "/")
+            elif scenario.startswith("hub-start:"):
+                lab_id = scenario.split(":", 1)[1]
+                await run.call(conn, f"GET /api/labs/start/{lab_id}", "GET", f"/api/labs/start/{lab_id}",
+                               until=_sse_finished, check=_sse_check)
+            await asyncio.sleep(_think(rng, think))
+    finally:
+        await conn.close()
+
+
+# --- Reporting ---
+
+def _percentile(sorted_values: list[float], q: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    idx = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return round(sorted_values[idx], 2)
+
+
+def summarize(run: Run, elapsed: float) -> dict:
+    endpoints = {}
+    for name, s in sorted(run.stats.items()):
+        lat = sorted(s.latencies_ms)
+        total = len(lat) + s.errors
+        endpoints[name] = {
+            "requests": total,
+            "ok": len(lat),
+            "errors": s.errors,
+            "error_rate": round(s.errors / total, 4) if total else 0.0,
+            "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+            "latency_ms": {
+                "mean": round(statistics.fmean(lat), 2) if lat else None,
+                "p50": _percentile(lat, 0.50),
+                "p90": _percentile(lat, 0.90),
+                "p95": _percentile(lat, 0.95),
+                "p99": _percentile(lat, 0.99),
+                "max": round(lat[-1], 2) if lat else None,
+            },
+            "status": {str(k): v for k, v in sorted(s.status.items())},
+            "bytes_in": s.bytes_in,
+            "error_reasons": dict(sorted(s.error_reasons.items(), key=lambda kv: -kv[1])),
+        }
+    return endpoints
+
+
+def _git_rev() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "-C", str(REPO_ROOT), "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, timeout=5,
+        )
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def print_table(result: dict, baseline: Optional[dict]) -> None:
+    cfg = result["config"]
+    print(
+        f"\n{cfg['scenario']} @ {cfg['url']}  students={cfg['students']}  think={cfg['think']}s  "
+        f"elapsed={result['elapsed_s']}s  rev={result.get('git_rev') or '-'}"
+    )
+    header = f"{'endpoint':<32}{'reqs':>7}{'err%':>7}{'rps':>8}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}"
+    print(header)
+    print("-" * len(header))
+    base_eps = (baseline or {}).get("endpoints", {})
+    for name, e in result["endpoints"].items():
+        lat = e["latency_ms"]
+        fmt = lambda v: "-" if v is None else f"{v:.1f}"
+        print(
+            f"{name:<32}{e['requests']:>7}{e['error_rate'] * 100:>6.1f}%{e['throughput_rps']:>8.1f}"
+            f"{fmt(lat['p50']):>9}{fmt(lat['p90']):>9}{fmt(lat['p99']):>9}{fmt(lat['max']):>9}"
+        )
+        b = base_eps.get(name)
+        if b and b["latency_ms"]["p50"] and lat["p50"]:
+            d = lambda k: f"{(lat[k] / b['latency_ms'][k] - 1) * 100:+.0f}%" if b["latency_ms"][k] and lat[k] else "-"
+            print(
+                f"{'  vs baseline':<32}{'':>7}{(e['error_rate'] - b['error_rate']) * 100:>+6.1f}%"
+                f"{e['throughput_rps'] - b['throughput_rps']:>+8.1f}{d('p50'):>9}{d('p90'):>9}{d('p99'):>9}{d('max'):>9}"
+            )
+        for reason, count in e["error_reasons"].items():
+            print(f"{'':<4}! {count} x {reason}")
+    print("latency in ms")
+
+
+def _target(args: argparse.Namespace) -> tuple[str, str]:
+    """(scenario, url) as recorded in the result's config."""
+    if args.scenario == "hub-start":
+        return f"hub-start:{args.lab}", args.url or args.hub
+    return args.scenario, args.url or f"{args.hub.rstrip('/')}/lab/{args.scenario}/"
+
+
+def baseline_mismatches(args: argparse.Namespace, baseline: dict) -> list[str]:
+    """Differences that make a baseline's deltas meaningless for this run."""
+    scenario, url = _target(args)
+    current = {"scenario": scenario, "url": url, "students": args.students, "think": args.think}
+    cfg = baseline.get("config") or {}
+    return [f"{key}: {cfg.get(key)!r} vs {value!r}" for key, value in current.items() if cfg.get(key) != value]
+
+
+async def main_async(args: argparse.Namespace) -> dict:
+    scenario, url = _target(args)
+
+    run = Run(url, args.timeout)
+    rng = random.Random(args.seed)
+    started = time.monotonic()
+    deadline = started + args.duration
+
+    await asyncio.gather(
+        *(
+            student(run, scenario, random.Random(rng.random()), args.think, deadline, args.accuracy)
+            for _ in range(args.students)
+        )
+    )
+    elapsed = round(time.monotonic() - started, 3)
+
+    return {
+        "tool": "wwc2025-loadtest",
+        "version": 1,
+        "git_rev": _git_rev(),
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "config": {
+            "scenario": scenario,
+            "url": url,
+            "students": args.students,
+            "duration": args.duration,
+            "think": args.think,
+            "accuracy": args.accuracy,
+            "seed": args.seed,
+        },
+        "elapsed_s": elapsed,
+        "endpoints": summarize(run, elapsed),
+    }
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Simulate a class of students against the labs.")
+    p.add_argument(
+        "scenario",
+        choices=["lab1", "lab3", "lab5", "hub-start"],
+        help="lab1/lab5: load the page and submit answers; lab3: load the board; hub-start: start a lab via SSE",
+    )
+    p.add_argument("--hub", default="http://localhost:8080", help="Lab Hub base URL (labs are reached at /lab/<id>/)")
+    p.add_argument("--url", help="Target base URL instead of the hub (e.g. a lab run directly on :5000)")
+    p.add_argument("--lab", default="lab1", help="Lab to start for the hub-start scenario")
+    p.add_argument("--students", type=int, default=30, help="Concurrent simulated students")
+    p.add_argument("--duration", type=float, default=30.0, help="Seconds to run")
+    p.add_argument("--think", type=float, default=5.0, help="Mean think time between requests, seconds (0 = closed loop)")
+    p.add_argument("--accuracy", type=float, default=0.7, help="Share of answers students get right")
+    p.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout, seconds")
+    p.add_argument("--seed", type=int, default=2025)
+    p.add_argument("--json", metavar="PATH", help="Write results as JSON ('-' for stdout)")
+    p.add_argument("--compare", metavar="PATH", help="Show deltas against an earlier --json result")
+    return p.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        mismatches = baseline_mismatches(args, baseline)
+        if mismatches:
+            print(f"Not comparing with {args.compare}; it was a different run ({'; '.join(mismatches)}).", file=sys.stderr)
+            return 2
+
+    result = asyncio.run(main_async(args))
+
+    if args.json == "-":
+        json.dump(result, sys.stdout, indent=2)
+        print()
+    else:
+        print_table(result, baseline)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(result, f, indent=2)
+
+    total_errors = sum(e["errors"] for e in result["endpoints"].values())
+    return 1 if total_errors and total_errors == sum(e["requests"] for e in result["endpoints"].values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
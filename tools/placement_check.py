@@ -0,0 +1,237 @@
+"""
+Checks the hub's multi-host lab placement against stand-in Docker hosts.
+
+No Docker daemon is needed: each host in WWC_DOCKER_HOSTS is answered by an
+in-memory stand-in that knows which images it has, whether it is up, and
+whether starting a container on it fails. The hub's own placement code
+(hub/app/docker_control.py) runs unchanged against them. Scenarios:
+
+    missing-image  the least loaded host lacks the image; the lab lands on the next
+    host-down      a host is unreachable; it is skipped
+    fall-through   starting the container fails on one host; the next host is tried
+    host-lost      the host a lab runs on goes down; the lab is reported stopped
+
+Run from a checkout with the hub's requirements installed
+(pip install -r hub/requirements.txt):
+
+    python tools/placement_check.py
+
+Exits non-zero if any scenario fails.
+"""
+from __future__ import annotations
+
+import itertools
+import os
+import sys
+from pathlib import Path
+from typing import Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+os.environ.setdefault("WWC_LABS_JSON", str(REPO_ROOT / "labs" / "labs.json"))
+os.environ["WWC_DOCKER_HOSTS"] = "a=tcp://a:2375#10.0.0.1, b=tcp://b:2375#10.0.0.2, c=tcp://c:2375#10.0.0.3"
+sys.path[:0] = [str(REPO_ROOT / "hub"), str(REPO_ROOT / "shared")]
+
+from docker.errors import APIError, DockerException, NotFound  # noqa: E402
+from requests.exceptions import ConnectionError as RequestsConnectionError  # noqa: E402
+
+from app import docker_control  # noqa: E402
+
+_host_ports = itertools.count(40000)
+
+
+# --- Stand-in hosts (just the parts of docker-py the hub uses) ---
+
+class StandInContainer:
+    def __init__(self, host: "StandInHost", name: str, ports: dict):
+        self.host = host
+        self.name = name
+        self.status = "running"
+        self.attrs = {"State": {}}
+        self.ports = {k: [{"HostIp": "0.0.0.0", "HostPort": str(v or next(_host_ports))}] for k, v in ports.items()}
+
+    def reload(self) -> None:
+        self.host.check()
+
+    def stop(self, timeout: int = 5) -> None:
+        self.host.check()
+        self.status = "exited"
+
+    def remove(self, force: bool = False) -> None:
+        self.host.containers.pop(self.name, None)
+
+    def logs(self, stream: bool = False, follow: bool = False, tail="all"):
+        return iter([b"stand-in lab\n"]) if stream else b"stand-in lab\n"
+
+
+class _Containers:
+    def __init__(self, host: "StandInHost"):
+        self.host = host
+
+    def get(self, name: str) -> StandInContainer:
+        self.host.check()
+        if name not in self.host.containers:
+            raise NotFound(f"No such container: {name}")
+        return self.host.containers[name]
+
+    def list(self) -> list[StandInContainer]:
+        self.host.check()
+        return [c for c in self.host.containers.values() if c.status in ("running", "paused")]
+
+    def run(self, image: str, name: str, ports: Optional[dict] = None, **kwargs) -> StandInContainer:
+        self.host.check()
+        if self.host.fail_run:
+            raise APIError("stand-in: container failed to start")
+        c = self.host.containers[name] = StandInContainer(self.host, name, ports or {})
+        return c
+
+
+class _Images:
+    def __init__(self, host: "StandInHost"):
+        self.host = host
+
+    def get(self, image: str) -> None:
+        self.host.check()
+        if image not in self.host.images:
+            raise NotFound(f"No such image: {image}")
+
+
+class _API:
+    api_version = "1.44"
+
+    def __init__(self, host: "StandInHost"):
+        self.host = host
+        self.base_url = f"http://{host.name}"
+
+    def get(self, url: str, timeout: Optional[float] = None) -> "_API":
+        try:
+            self.host.check()
+        except DockerException as e:
+            raise RequestsConnectionError(str(e))
+        return self
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def json(self) -> dict:
+        running = sum(c.status == "running" for c in self.host.containers.values())
+        return {"ContainersRunning": running, "MemTotal": self.host.mem_gib * 2**30}
+
+
+class StandInHost:
+    def __init__(self, name: str, mem_gib: int = 8, images: tuple[str, ...] = ()):
+        self.name = name
+        self.mem_gib = mem_gib
+        self.images = set(images)
+        self.up = True
+        self.fail_run = False
+        self.containers: dict[str, StandInContainer] = {}
+        self.api = _API(self)
+        self.containers_api = _Containers(self)
+
+    def check(self) -> None:
+        if not self.up:
+            raise DockerException(f"stand-in: {self.name} is down")
+
+
+class StandInClient:
+    def __init__(self, host: StandInHost):
+        self.api = host.api
+        self.containers = host.containers_api
+        self.images = _Images(host)
+
+
+# --- Scenarios ---
+
+def _reset(labs, **hosts: StandInHost) -> dict[str, StandInHost]:
+    images = tuple(lab.image for lab in labs)
+    stand_ins = {h.name: StandInHost(h.name, images=images) for h in docker_control.HOSTS}
+    stand_ins.update(hosts)
+    docker_control.docker_client = lambda host=None: StandInClient(stand_ins[(host or docker_control.HOSTS[0]).name])
+    docker_control._host_status.clear()
+    docker_control._placements.clear()
+    docker_control._active_lab_id = None
+    return stand_ins
+
+
+def _start(lab_id: str) -> dict:
+    return list(docker_control.start_lab_steps(lab_id))[-1]
+
+
+def check_missing_image(labs) -> Optional[str]:
+    lab = labs[0]
+    # "a" has the most memory, so it is tried first
+    _reset(labs, a=StandInHost("a", mem_gib=64), b=StandInHost("b", mem_gib=16, images=(lab.image,)))
+    done = _start(lab.id)
+    if done.get("host") != "b":
+        return f"expected the lab on b, got {done}"
+    return None
+
+
+def check_host_down(labs) -> Optional[str]:
+    lab = labs[0]
+    hosts = _reset(labs)
+    hosts["a"].up = False
+    done = _start(lab.id)
+    if done["type"] != "done" or done.get("host") == "a":
+        return f"expected the lab on a healthy host, got {done}"
+    if next(h for h in docker_control.host_statuses() if h["name"] == "a")["healthy"]:
+        return "host a is down but reported healthy"
+    return None
+
+
+def check_fall_through(labs) -> Optional[str]:
+    lab = labs[0]
+    hosts = _reset(labs, a=StandInHost("a", mem_gib=64, images=tuple(l.image for l in labs)))
+    hosts["a"].fail_run = True
+    done = _start(lab.id)
+    if done.get("host") in (None, "a"):
+        return f"expected the lab on another host after a failed start on a, got {done}"
+    return None
+
+
+def check_host_lost(labs) -> Optional[str]:
+    lab = labs[0]
+    hosts = _reset(labs)
+    done = _start(lab.id)
+    placed_on = done.get("host")
+    if placed_on is None:
+        return f"lab did not start: {done}"
+
+    hosts[placed_on].up = False
+    host = next(h for h in docker_control.HOSTS if h.name == placed_on)
+    docker_control.check_host(host, max_age=0)
+    if docker_control.get_placement(lab.id) is not None:
+        return f"{placed_on} is down but the lab is still placed there"
+    if docker_control.get_running_lab_id() is not None:
+        return "lab is still reported as running"
+    if lab.id in next(h for h in docker_control.host_statuses() if h["name"] == placed_on)["labs"]:
+        return f"host status still lists the lab on {placed_on}"
+
+    hosts[placed_on].up = True
+    docker_control.check_host(host, max_age=0)
+    if docker_control.get_running_lab_id() != lab.id or docker_control.get_lab_host(lab.id) != placed_on:
+        return f"lab was not found again on {placed_on} once it was back"
+    return None
+
+
+SCENARIOS = {
+    "missing-image": check_missing_image,
+    "host-down": check_host_down,
+    "fall-through": check_fall_through,
+    "host-lost": check_host_lost,
+}
+
+
+def main() -> int:
+    labs = docker_control.load_labs()
+    failed = 0
+    for name, check in SCENARIOS.items():
+        problem = check(labs)
+        print(f"{'ok  ' if problem is None else 'FAIL'} {name}" + (f": {problem}" if problem else ""))
+        failed += problem is not None
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())